@@ -1,45 +1,220 @@
 import cv2
 import numpy as np
+import threading
+import time
+from frame_sources import open_source
+
+RING_SIZE = 4  # Preallocated frame slots; the newest frame stays valid while the next ones are written
+MAX_READ_FAILURES = 30  # Consecutive failed reads before the capture thread gives up
+FIRST_FRAME_TIMEOUT = 5.0  # Seconds get_frame() waits for the very first frame (cold webcams under DSHOW / MSMF are slow)
+
+# ✅ Named capture profiles: the (width, height) requested from the device
+CAPTURE_PROFILES = {
+    "preview": (1280, 720),  # Live feed on the recognition pages
+    "ocr": (1920, 1080),  # High-resolution stills for text recognition
+    "document": (3840, 2160),  # Full-page document stills; devices fall back to their largest mode
+    "detector": (640, 480),  # Low-resolution stream when only inference needs frames
+}
+STILL_PROFILES = {"document"}  # Used to grab single stills: one ring slot, so memory stays at one frame
+
+def fit_frame(frame, size=None, max_side=None):
+    """Resize `frame` only if it differs from what the consumer asked for.
+
+    `size` is an exact (width, height); `max_side` caps the longer side and keeps the aspect ratio.
+    Returns the input frame untouched when it already fits.
+    """
+    height, width = frame.shape[:2]
+    if size is None and max_side is not None and max(width, height) > max_side:
+        scale = max_side / max(width, height)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    if size is None or tuple(size) == (width, height):
+        return frame
+
+    # INTER_AREA for downscaling, INTER_LINEAR when the device delivered less than requested
+    interpolation = cv2.INTER_AREA if size[0] < width else cv2.INTER_LINEAR
+    return cv2.resize(frame, tuple(size), interpolation=interpolation)
 
 class CameraManager:
     _instance = None  # Singleton instance
 
-    def __new__(cls, video_source=0):
+    def __new__(cls, video_source=0, profile="preview"):
+        """`video_source` is a device index, a clip path, an image folder, "synthetic" or a FrameSource."""
         if cls._instance is None:
             cls._instance = super(CameraManager, cls).__new__(cls)
             cls._instance.video_source = video_source
-            cls._instance.capture = cv2.VideoCapture(video_source, cv2.CAP_DSHOW)  # ✅ Use DirectShow for better Windows compatibility
+            cls._instance.source = open_source(video_source)  # ✅ Backend picked per OS for live devices
 
-            # ✅ Set High-Quality Resolution
-            cls._instance.set_resolution(1280, 720)  # Change to (1920, 1080) if needed
+            # ✅ Negotiate the profile's resolution and remember what the device actually gave us
+            cls._instance.profile = profile
+            cls._instance.negotiated = {}  # Profile name -> (width, height) the device delivered
+            cls._instance._negotiate(profile)
 
-            if not cls._instance.capture.isOpened():
+            if not cls._instance.source.is_opened():
                 print("⚠️ Error: Could not access the camera.")
-        
+
+            # ✅ One capture thread owns the device; pages only read from the ring
+            cls._instance._seq = 0  # Sequence number of the newest published frame (never reset)
+            cls._instance._frame_ready = threading.Condition()
+            cls._instance._init_ring()
+            cls._instance._start_capture_thread()
+
         return cls._instance
 
     def set_resolution(self, width, height):
-        """✅ Set camera resolution to improve quality."""
-        if self.capture and self.capture.isOpened():
-            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-            print(f"📷 Camera resolution set to {width}x{height}")
+        """✅ Set camera resolution to improve quality. Returns the size the source will deliver."""
+        actual = self.source.set_resolution(width, height)
+        print(f"📷 Camera resolution set to {actual[0]}x{actual[1]}")
+        return actual
+
+    def _negotiate(self, profile):
+        """Request a profile's resolution and record the size the device actually negotiated."""
+        width, height = CAPTURE_PROFILES[profile]
+        actual = self.set_resolution(width, height)
+        self.negotiated[profile] = actual
+        if actual != (width, height):
+            print(f"📷 Profile '{profile}' negotiated {actual[0]}x{actual[1]} (asked {width}x{height})")
+        return actual
+
+    def use_profile(self, profile):
+        """Switch the device to another capture profile; returns the negotiated (width, height)."""
+        if profile == self.profile:
+            return self.frame_size()
+
+        self._stop_capture_thread()
+        self.profile = profile
+        actual = self._negotiate(profile)
+        self._init_ring()
+        self._start_capture_thread()
+        return actual
+
+    def frame_size(self):
+        """Return the (width, height) the device delivers for the current profile."""
+        return self.negotiated[self.profile]
+
+    def _init_ring(self):
+        """Preallocate the frame ring at the resolution the device actually negotiated."""
+        width, height = self.frame_size()
+        slots = 1 if self.profile in STILL_PROFILES else RING_SIZE
+        ring = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(slots)]
+
+        with self._frame_ready:
+            self._ring = ring
+            self._ring_seq = [0] * slots  # Sequence number of the frame held in each slot
+            self._ring_time = [0.0] * slots  # time.monotonic() when each slot was published
+            self._latest = -1  # Slot index of the newest published frame
+
+    def _start_capture_thread(self):
+        """Start the dedicated thread that reads the device into the ring."""
+        self._running = self.source.is_opened()
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        if self._running:
+            self._capture_thread.start()
 
-    def get_frame(self, preprocess=False):
+    def _capture_loop(self):
+        """Grab frames continuously and publish each one with a new sequence number."""
+        failures = 0
+        while self._running:
+            slot = (self._latest + 1) % len(self._ring)  # Always overwrite the oldest slot, never the newest
+
+            if len(self._ring) == 1:
+                with self._frame_ready:  # Single slot: the newest frame is overwritten, so no copy may run meanwhile
+                    ok, frame = self.source.read(self._ring[slot])
+            else:
+                ok, frame = self.source.read(self._ring[slot])
+
+            if self.source.finished:
+                print("📼 Frame source finished.")
+                break
+            if not ok or frame is None:
+                failures += 1
+                if failures >= MAX_READ_FAILURES:
+                    print("⚠️ Camera stopped delivering frames.")
+                    break
+                time.sleep(0.01)
+                continue
+            failures = 0
+
+            if frame is not self._ring[slot]:
+                self._ring[slot] = frame  # Device changed size; OpenCV allocated a new buffer for this slot
+
+            with self._frame_ready:
+                self._seq += 1
+                self._ring_seq[slot] = self._seq
+                self._ring_time[slot] = time.monotonic()
+                self._latest = slot
+                self._frame_ready.notify_all()
+
+        self._running = False
+        with self._frame_ready:
+            self._frame_ready.notify_all()  # Wake any waiting consumer so it can notice the stop
+
+    def _stop_capture_thread(self):
+        """Stop the capture thread and wait for its current read to finish."""
+        self._running = False
+        if self._capture_thread.is_alive():
+            self._capture_thread.join(timeout=1.0)
+
+    def is_running(self):
+        """Return True while the capture thread is delivering frames."""
+        return self._running
+
+    def frame_time(self, seq):
+        """Return the time.monotonic() at which frame `seq` was captured, or None if it left the ring."""
+        with self._frame_ready:
+            for slot, slot_seq in enumerate(self._ring_seq):
+                if slot_seq == seq:
+                    return self._ring_time[slot]
+        return None
+
+    def _take(self, slot, copy, size, max_side):
+        """Return the frame in `slot` at the requested size; a resize already yields a private copy."""
+        frame = self._ring[slot]
+        fitted = fit_frame(frame, size, max_side)
+        if fitted is frame and copy:
+            fitted = frame.copy()
+        return fitted
+
+    def read_latest(self, copy=True, size=None, max_side=None):
+        """Return (seq, frame) for the newest frame without blocking; (0, None) before the first frame.
+
+        Pass copy=False only when the frame is consumed immediately (e.g. blitted to a texture);
+        the slot is reused after RING_SIZE - 1 newer frames have been captured (at once for STILL_PROFILES).
+        `size` / `max_side` are applied only when the device frame differs (see fit_frame).
+        """
+        with self._frame_ready:
+            if self._latest < 0:
+                return 0, None
+            return self._ring_seq[self._latest], self._take(self._latest, copy, size, max_side)
+
+    def read_after(self, seq, timeout=0.0, copy=True, size=None, max_side=None):
+        """Return (seq, frame) for the newest frame newer than `seq`.
+
+        Returns immediately by default; with a timeout, waits up to that many seconds.
+        If nothing newer is available the given `seq` is returned with a None frame.
+        """
+        with self._frame_ready:
+            fresh = lambda: self._seq > seq and self._latest >= 0  # Ring is empty right after a profile switch
+            if timeout and not fresh():
+                self._frame_ready.wait_for(lambda: fresh() or not self._running, timeout)
+            if self._seq <= seq or self._latest < 0:
+                return seq, None
+            return self._ring_seq[self._latest], self._take(self._latest, copy, size, max_side)
+
+    def get_frame(self, preprocess=False, size=(1280, 720)):
         """Retrieve a frame from the camera with optimized settings. If preprocess=True, convert to grayscale."""
-        if self.capture and self.capture.isOpened():
-            ret, frame = self.capture.read()
+        # ✅ Only waits until the first frame exists; resizes only if the device size differs from `size`
+        seq, frame = self.read_after(0, timeout=FIRST_FRAME_TIMEOUT, size=size)
+        if frame is None:
+            return False, None
 
-            # ✅ Reduce frame size dynamically if lag is detected
-            if ret:
-                frame = cv2.resize(frame, (1280, 720), interpolation=cv2.INTER_AREA)  # Smooth downscaling
-                if preprocess:
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Preprocess for OCR
-                return ret, frame
-        return False, None
+        if preprocess:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Preprocess for OCR
+        return True, frame
 
     def release_camera(self):
-        """Release the camera."""
-        if self.capture and self.capture.isOpened():
-            self.capture.release()
-            CameraManager._instance = None  # Reset singleton instance
+        """Stop the capture thread and release the camera."""
+        self._stop_capture_thread()
+
+        self.source.release()
+        CameraManager._instance = None  # Reset singleton instance
@@ -0,0 +1,126 @@
+"""Object detector backends compared on a recorded clip: speed and agreement with PyTorch.
+
+Every frame of the clip is run through each backend. The PyTorch FP32 detections are the
+reference; for the other backends, precision and recall are computed against it (same class,
+IoU >= 0.5), so any accuracy lost by export or INT8 quantization shows up directly.
+
+    python benchmarks/bench_detector.py --clip clips/hallway.mp4 --backends torch onnx onnx:int8 openvino
+    python benchmarks/bench_detector.py --clip synthetic --frames 50 --json detector.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from CameraManager import fit_frame  # noqa: E402
+from frame_sources import open_source  # noqa: E402
+from object_detector import create_detector  # noqa: E402
+
+def load_frames(clip, count):
+    """Decode up to `count` frames up front so decoding is not timed."""
+    source = open_source(clip, speed=0)
+    frames = []
+    try:
+        while len(frames) < count:
+            ret, frame = source.read()
+            if not ret:
+                break
+            frames.append(fit_frame(frame, max_side=640))
+    finally:
+        source.release()
+    return frames
+
+def box_iou(a, b):
+    """Pairwise IoU between (N, 4) and (M, 4) x1, y1, x2, y2 boxes."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+def matches(reference, detections, threshold=0.5):
+    """Greedy one-to-one matches of same-class boxes with IoU >= threshold."""
+    if not len(reference) or not len(detections):
+        return 0
+    ious = box_iou(reference[:, :4], detections[:, :4])
+    ious[reference[:, None, 5] != detections[None, :, 5]] = 0
+    matched = 0
+    for d in np.argsort(-detections[:, 4]):
+        r = int(ious[:, d].argmax())
+        if ious[r, d] >= threshold:
+            ious[r, :] = 0
+            matched += 1
+    return matched
+
+def run_backend(spec, frames):
+    start = time.perf_counter()
+    detector = create_detector(spec)
+    load_s = time.perf_counter() - start
+    detector.detect(frames[0])  # Warm up
+
+    outputs, times = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        outputs.append(detector.detect(frame))
+        times.append(time.perf_counter() - t0)
+    ms = np.asarray(times) * 1000.0
+    return outputs, {
+        "backend": detector.backend,
+        "load_s": round(load_s, 3),
+        "fps": round(len(frames) / sum(times), 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clip", default="synthetic", help="video file, image folder or 'synthetic'")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx:int8", "openvino", "openvino:int8"])
+    parser.add_argument("--json", help="write the results to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    # Resolve against the caller's directory: the benchmark later changes into the app directory
+    if args.clip != "synthetic":
+        args.clip = os.path.abspath(args.clip)
+    if args.json and args.json != "-":
+        args.json = os.path.abspath(args.json)
+
+    os.chdir(ROOT)  # yolov8n.pt and model_cache/ live in the app directory
+    frames = load_frames(args.clip, args.frames)
+    if not frames:
+        sys.exit(f"No frames could be read from {args.clip}")
+
+    results, reference = [], None
+    for spec in ["torch"] + [b for b in args.backends if b != "torch"]:
+        outputs, result = run_backend(spec, frames)
+        if reference is None:
+            reference = outputs
+        else:
+            matched = sum(matches(r, d) for r, d in zip(reference, outputs))
+            total_ref, total_det = sum(len(r) for r in reference), sum(len(d) for d in outputs)
+            result["precision_vs_torch"] = round(matched / total_det, 4) if total_det else None
+            result["recall_vs_torch"] = round(matched / total_ref, 4) if total_ref else None
+        results.append(result)
+        print(f"{result['backend']:<14} {result['fps']:>7.2f} FPS  p50 {result['p50_ms']:>8.2f} ms  "
+              f"p95 {result['p95_ms']:>8.2f} ms  precision {result.get('precision_vs_torch', '-')}  "
+              f"recall {result.get('recall_vs_torch', '-')}")
+
+    if args.json:
+        text = json.dumps({"clip": args.clip, "frames": len(frames), "results": results}, indent=2)
+        if args.json == "-":
+            print(text)
+        else:
+            with open(args.json, "w") as f:
+                f.write(text)
+
+if __name__ == "__main__":
+    main()
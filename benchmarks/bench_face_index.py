@@ -0,0 +1,63 @@
+"""Face identification query latency against roster size.
+
+Fills a FaceIndex with random unit-length embeddings and times top-1 queries for a
+single face and for a batch of faces (one classroom frame), with exact search and,
+when hnswlib is installed, with the approximate index.
+
+    python benchmarks/bench_face_index.py --sizes 10 100 1000 5000 20000 --batch 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from face_index import EMBEDDING_DIM, FaceIndex  # noqa: E402
+
+def random_unit(rng, count, dim):
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def time_queries(index, queries, repeats):
+    index.identify(queries)  # Warm up (and build the ANN graph if it applies)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        index.identify(queries)
+    return (time.perf_counter() - start) / repeats * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000, 20000])
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    parser.add_argument("--batch", type=int, default=20, help="faces per query batch")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    try:
+        import hnswlib  # noqa: F401
+        has_ann = True
+    except ImportError:
+        has_ann = False
+        print("hnswlib not installed: approximate column skipped")
+
+    rng = np.random.default_rng(0)
+    print(f"{'roster':>8} {'exact 1':>10} {'exact batch':>12} {'ann 1':>10} {'ann batch':>10}   (ms per call)")
+    for size in args.sizes:
+        embeddings = random_unit(rng, size, args.dim)
+        labels = np.arange(size)
+        single, batch = random_unit(rng, 1, args.dim), random_unit(rng, args.batch, args.dim)
+
+        exact = FaceIndex(dim=args.dim, ann_min_size=float("inf"))
+        exact.add(labels, embeddings, calibrate=False)
+        row = f"{size:>8} {time_queries(exact, single, args.repeats):>10.3f} {time_queries(exact, batch, args.repeats):>12.3f}"
+
+        if has_ann:
+            approx = FaceIndex(dim=args.dim, ann_min_size=0)
+            approx.add(labels, embeddings, calibrate=False)
+            row += f" {time_queries(approx, single, args.repeats):>10.3f} {time_queries(approx, batch, args.repeats):>10.3f}"
+        print(row)
+
+if __name__ == "__main__":
+    main()
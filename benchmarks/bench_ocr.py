@@ -0,0 +1,157 @@
+"""OCR engine comparison on a fixed set of document images: chars/sec, CER and memory.
+
+Each engine runs in its own subprocess so peak RSS is that engine's alone. The default
+image set is generated deterministically (clean, small print, rotated, blurred and noisy
+pages); pass --images with a folder of page.png + page.txt (ground truth) pairs to use
+real documents instead.
+
+    python benchmarks/bench_ocr.py
+    python benchmarks/bench_ocr.py --engines easyocr tesseract --images docs/ --json ocr.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from ocr_engines import ENGINE_CLASSES, character_error_rate, installed_engines  # noqa: E402
+from ocr_pipeline import reading_lines  # noqa: E402
+
+PAGE_TEXT = [
+    "Mavi reads printed text aloud for",
+    "people who are blind or have low vision.",
+    "Take two tablets every 8 hours after meals.",
+    "Do not exceed 6 tablets in 24 hours.",
+    "Exp. 12/2027  Lot No. A4319-77",
+]
+
+# name -> (font scale, rotation degrees, blur kernel, noise sigma)
+VARIANTS = {
+    "clean": (1.2, 0.0, 0, 0.0),
+    "small_print": (0.6, 0.0, 0, 0.0),
+    "rotated": (1.2, 4.0, 0, 0.0),
+    "blurred": (1.2, 0.0, 5, 0.0),
+    "noisy": (1.2, 0.0, 0, 18.0),
+}
+
+def synthetic_pages():
+    """[(name, grayscale image, ground truth)] rendered the same way every run."""
+    rng = np.random.default_rng(0)
+    pages = []
+    for name, (scale, angle, blur, noise) in VARIANTS.items():
+        line_height = int(60 * scale)
+        image = np.full((line_height * (len(PAGE_TEXT) + 2), int(1100 * scale)), 255, dtype=np.uint8)
+        for i, line in enumerate(PAGE_TEXT):
+            cv2.putText(image, line, (int(30 * scale), line_height * (i + 1) + line_height // 2),
+                        cv2.FONT_HERSHEY_SIMPLEX, scale, 0, max(1, int(2 * scale)), cv2.LINE_AA)
+        if angle:
+            h, w = image.shape
+            matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+            image = cv2.warpAffine(image, matrix, (w, h), borderValue=255)
+        if blur:
+            image = cv2.GaussianBlur(image, (blur, blur), 0)
+        if noise:
+            image = np.clip(image + rng.normal(0, noise, image.shape), 0, 255).astype(np.uint8)
+        pages.append((name, image, "\n".join(PAGE_TEXT)))
+    return pages
+
+def folder_pages(folder):
+    pages = []
+    for file_name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(file_name)
+        truth_path = os.path.join(folder, stem + ".txt")
+        if ext.lower() in (".png", ".jpg", ".jpeg") and os.path.exists(truth_path):
+            with open(truth_path, encoding="utf-8") as f:
+                pages.append((stem, cv2.imread(os.path.join(folder, file_name), cv2.IMREAD_GRAYSCALE), f.read()))
+    return pages
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if platform.system() == "Darwin" else rss / 1024
+
+def normalise(text):
+    return " ".join(text.lower().split())
+
+def run_engine(name, pages):
+    """Benchmark one engine in this process; returns its report."""
+    base_rss = peak_rss_mb()
+    start = time.perf_counter()
+    engine = ENGINE_CLASSES[name]()
+    load_s = time.perf_counter() - start
+    engine.readtext(pages[0][1])  # Warm up
+
+    per_page, total_chars, total_s, total_ref, total_errors = {}, 0, 0.0, 0, 0.0
+    for page_name, image, truth in pages:
+        start = time.perf_counter()
+        results = engine.readtext(image)
+        seconds = time.perf_counter() - start
+        text = " ".join(line for _, line in reading_lines(results, min_confidence=0.0))
+        cer = character_error_rate(normalise(truth), normalise(text))
+        per_page[page_name] = {"seconds": round(seconds, 3), "cer": round(cer, 4)}
+        total_chars += len(normalise(text))
+        total_s += seconds
+        total_ref += len(normalise(truth))
+        total_errors += cer * len(normalise(truth))
+
+    return {
+        "engine": name,
+        "load_s": round(load_s, 2),
+        "chars_per_s": round(total_chars / total_s, 1) if total_s else None,
+        "cer": round(total_errors / total_ref, 4) if total_ref else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_growth_mb": round(peak_rss_mb() - base_rss, 1) if base_rss is not None else None,
+        "pages": per_page,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=None, help="default: every installed engine")
+    parser.add_argument("--images", help="folder of page images with .txt ground truth")
+    parser.add_argument("--json", help="write the results to this file ('-' for stdout)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)  # Internal: benchmark one engine and print JSON
+    args = parser.parse_args()
+
+    pages = folder_pages(args.images) if args.images else synthetic_pages()
+    if not pages:
+        sys.exit("No page images with ground truth found")
+
+    if args.worker:
+        print(json.dumps(run_engine(args.worker, pages)))
+        return
+
+    results = []
+    for name in args.engines or installed_engines():
+        command = [sys.executable, os.path.abspath(__file__), "--worker", name]
+        if args.images:
+            command += ["--images", args.images]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{name:<10} failed: {completed.stderr.strip().splitlines()[-1:]}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{name:<10} {result['chars_per_s']:>8} chars/s  CER {result['cer']:.3f}  "
+              f"peak RSS {result['peak_rss_mb']:.0f} MB  (load {result['load_s']} s)")
+
+    if args.json:
+        text = json.dumps({"platform": platform.platform(), "pages": [p[0] for p in pages],
+                           "results": results}, indent=2)
+        if args.json == "-":
+            print(text)
+        else:
+            with open(args.json, "w") as f:
+                f.write(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Headless end-to-end latency benchmark for the object, face and OCR pipelines.
+
+Each pipeline is driven through CameraManager from a recorded clip, an image folder
+or the synthetic source, with no Kivy window. For every processed frame the time spent
+in each stage is recorded:
+
+    capture      frame age when the pipeline picks it up (capture -> consumer)
+    preprocess   resize / colour conversion
+    inference    model call(s)
+    postprocess  turning raw outputs into the text the page would show / speak
+    tts_enqueue  queueing the announcement on the shared Announcer (playback is silent)
+
+plus end_to_end (capture -> announcement enqueued), throughput and peak RSS.
+
+    python benchmarks/bench_pipelines.py --pipeline object --clip clips/hallway.mp4 --json out.json
+    python benchmarks/bench_pipelines.py --pipeline all --clip synthetic --speed 0 --frames 100
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from CameraManager import CameraManager, fit_frame  # noqa: E402
+from frame_sources import open_source  # noqa: E402
+from model_registry import models  # noqa: E402
+from speech import Announcer  # noqa: E402
+
+STAGES = ("capture", "preprocess", "inference", "postprocess", "tts_enqueue", "end_to_end")
+
+def silent_player(text, stop_event, on_start):
+    """Stands in for synthesis + playback so only the queueing path is measured."""
+    on_start()
+
+class ObjectPipeline:
+    name = "object"
+
+    def setup(self):
+        os.chdir(ROOT)  # yolov8n.pt and the export cache live in the app directory
+        from object_detector import create_detector
+        self.detector = create_detector()
+
+    def preprocess(self, frame):
+        return fit_frame(frame, max_side=640)
+
+    def infer(self, frame):
+        return self.detector.detect(frame)
+
+    def postprocess(self, detections):
+        names = {self.detector.names[int(d[5])] for d in detections}
+        return f"Detected: {', '.join(sorted(names))}" if names else None
+
+class FacePipeline:
+    name = "face"
+
+    def setup(self):
+        os.chdir(ROOT)  # The face model store and its images live in the app directory
+        import face_store  # noqa: F401  (registers "face_model")
+        from face_pipeline import identify_faces
+        self.identify = identify_faces
+        self.detector = models.get("face_detector")
+        self.index, self.label_map = models.get("face_model")
+        self.trained = self.index is not None
+
+    def preprocess(self, frame):
+        return frame  # identify_faces does its own colour conversions
+
+    def infer(self, frame):
+        if not self.trained:
+            return []
+        return self.identify(self.detector, self.index, frame)
+
+    def postprocess(self, matches):
+        names = [self.label_map.get(match.label, "Unknown") for match in matches if match.accepted]
+        return f"This is, {names[0]}" if names else None
+
+class TrackedFacePipeline(FacePipeline):
+    """Face pipeline with FaceTracker: detection and recognition only run when due."""
+    name = "face_tracked"
+
+    def setup(self):
+        super().setup()
+        from face_tracker import FaceTracker
+        self.tracker = FaceTracker()
+
+    def infer(self, frame):
+        if not self.trained:
+            return []
+        return [track for track in self.tracker.step(frame, self.detector, self.index) if track.label is not None]
+
+    def postprocess(self, tracks):
+        new = [track for track in tracks if track.accepted and not track.announced]
+        for track in new:
+            track.announced = True
+        return f"This is, {self.label_map.get(new[0].label, 'Unknown')}" if new else None
+
+class OCRPipeline:
+    name = "ocr"
+
+    def setup(self):
+        os.chdir(ROOT)  # The cached engine choice lives in the app directory
+        from ocr_engines import create_ocr_engine
+        self.reader = create_ocr_engine()
+
+    def preprocess(self, frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def infer(self, gray):
+        return self.reader.readtext(gray)
+
+    def postprocess(self, results):
+        text = " ".join(res[1] for res in results if res[2] >= 0.8)
+        return text or None
+
+class TwoStageOCRPipeline(OCRPipeline):
+    """OCR through TwoStageOCR: text boxes already recognized are served from its cache."""
+    name = "ocr_two_stage"
+
+    def setup(self):
+        super().setup()
+        from ocr_pipeline import TwoStageOCR, reading_lines
+        self.ocr = TwoStageOCR(self.reader)
+        self.reading_lines = reading_lines
+
+    def infer(self, gray):
+        return self.ocr.read(gray)
+
+    def postprocess(self, results):
+        return " ".join(text for y, text in self.reading_lines(results, 0.8)) or None
+
+PIPELINES = {p.name: p for p in (ObjectPipeline, FacePipeline, TrackedFacePipeline, OCRPipeline, TwoStageOCRPipeline)}
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where `resource` is unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if platform.system() == "Darwin" else rss / 1024  # bytes on macOS, KB on Linux
+
+def summarize(samples):
+    """p50/p95/p99/mean in milliseconds for one stage."""
+    if not samples:
+        return None
+    ms = np.asarray(samples) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3), "mean_ms": round(float(ms.mean()), 3), "count": len(samples)}
+
+def run_pipeline(pipeline, clip, speed, max_frames):
+    """Replay `clip` through one pipeline and return its report."""
+    pipeline.setup()
+    announcer = Announcer(player=silent_player)
+    camera = CameraManager(open_source(clip, speed=speed))
+    samples = {stage: [] for stage in STAGES}
+    processed, last_seq = 0, 0
+
+    start = time.perf_counter()
+    try:
+        while processed < max_frames:
+            seq, frame = camera.read_after(last_seq, timeout=1.0)
+            if frame is None:
+                if not camera.is_running():
+                    break
+                continue
+            t_pick = time.monotonic()
+            captured = camera.frame_time(seq) or t_pick
+            last_seq = seq
+
+            x = pipeline.preprocess(frame)
+            t_pre = time.monotonic()
+            raw = pipeline.infer(x)
+            t_inf = time.monotonic()
+            message = pipeline.postprocess(raw)
+            t_post = time.monotonic()
+            if message:
+                announcer.say(message, key=pipeline.name, min_interval=0.0)
+            t_tts = time.monotonic()
+
+            samples["capture"].append(t_pick - captured)
+            samples["preprocess"].append(t_pre - t_pick)
+            samples["inference"].append(t_inf - t_pre)
+            samples["postprocess"].append(t_post - t_inf)
+            if message:
+                samples["tts_enqueue"].append(t_tts - t_post)
+                samples["end_to_end"].append(t_tts - captured)
+            processed += 1
+    finally:
+        camera.release_camera()
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "pipeline": pipeline.name,
+        "frames": processed,
+        "fps": round(processed / elapsed, 3) if elapsed else None,
+        "stages": {stage: summarize(values) for stage, values in samples.items()},
+        "peak_rss_mb": peak_rss_mb(),
+        "speech": announcer.metrics(),
+    }
+    ocr = getattr(pipeline, "ocr", None)
+    if ocr:
+        report["ocr_cache"] = dict(ocr.stats)
+    tracker = getattr(pipeline, "tracker", None)
+    if tracker:
+        report["detector_calls"] = tracker.detector_calls
+        report["recognizer_calls"] = tracker.recognizer_calls
+    return report
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(report):
+    print(f"\n{report['pipeline']}: {report['frames']} frames, {report['fps']} FPS, peak RSS {report['peak_rss_mb']} MB")
+    for stage, stats in report["stages"].items():
+        if stats:
+            print(f"  {stage:<12} p50 {stats['p50_ms']:9.2f}  p95 {stats['p95_ms']:9.2f}  p99 {stats['p99_ms']:9.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pipeline", choices=[*PIPELINES, "all"], default="all")
+    parser.add_argument("--clip", default="synthetic", help="video file, image folder or 'synthetic'")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (1 = real time, 0 = as fast as possible)")
+    parser.add_argument("--frames", type=int, default=300, help="max frames processed per pipeline")
+    parser.add_argument("--json", help="write the report to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    # Resolve against the caller's directory: the benchmark later changes into the app directory
+    if args.clip != "synthetic":
+        args.clip = os.path.abspath(args.clip)
+    if args.json and args.json != "-":
+        args.json = os.path.abspath(args.json)
+
+    names = list(PIPELINES) if args.pipeline == "all" else [args.pipeline]
+    reports = [run_pipeline(PIPELINES[name](), args.clip, args.speed, args.frames) for name in names]
+    for report in reports:
+        print_report(report)
+
+    if args.json:
+        output = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "platform": platform.platform(),
+            "clip": args.clip,
+            "speed": args.speed,
+            "results": reports,  # peak_rss_mb is process-wide, so it accumulates across pipelines
+        }
+        text = json.dumps(output, indent=2)
+        if args.json == "-":
+            print(text)
+        else:
+            with open(args.json, "w") as f:
+                f.write(text)
+
+if __name__ == "__main__":
+    main()
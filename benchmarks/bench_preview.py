@@ -0,0 +1,66 @@
+"""Compare per-frame allocations of the old preview path against CameraPreview.
+
+Old path: cv2.flip(frame, 0).tobytes() + Texture.create() on every frame.
+New path: one flat view of the frame (texture is reused and flipped via tex coords).
+
+Only the CPU side is measured, so no window or GL context is needed.
+
+    python benchmarks/bench_preview.py --width 1280 --height 720 --frames 300
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preview_widget import frame_buffer  # noqa: E402
+
+def old_path(frame):
+    return cv2.flip(frame, 0).tobytes()
+
+def new_path(frame):
+    return frame_buffer(frame)
+
+def measure(name, fn, frames):
+    """Run `fn` over all frames and report time and bytes allocated per frame."""
+    fn(frames[0])  # Warm up
+    tracemalloc.start()
+    allocated = 0
+
+    start = time.perf_counter()
+    for frame in frames:
+        snapshot_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        buf = fn(frame)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - snapshot_before
+        del buf
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    per_frame = allocated / len(frames)
+    print(f"{name:<10} {elapsed / len(frames) * 1000:8.3f} ms/frame  {per_frame / 1e6:8.3f} MB allocated/frame")
+    return per_frame
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(8)]
+    frames = [frames[i % len(frames)] for i in range(args.frames)]
+
+    print(f"Preview upload, {args.width}x{args.height} BGR, {args.frames} frames")
+    old = measure("old", old_path, frames)
+    new = measure("preview", new_path, frames)
+    print(f"Garbage per frame reduced by {(old - new) / 1e6:.2f} MB ({old * 30 / 1e6:.1f} MB/s -> {new * 30 / 1e6:.3f} MB/s at 30 FPS)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import time
+import cv2
+import numpy as np
+
+INPUT_SIZES = (320, 480, 640)  # Detector input sizes the governor moves between
+LATENCY_BUDGET = 0.12  # Target seconds per inference
+THUMB_SIZE = (32, 24)  # Grayscale thumbnail used to measure scene change
+CHANGE_THRESHOLD = 6.0  # Mean absolute thumbnail difference (0-255) that counts as a changed scene
+STATIC_REFRESH = 3.0  # Seconds after which a static scene is re-checked anyway
+
+class DetectionGovernor:
+    """Picks the detector input size and rate from measured latency, and skips unchanged scenes.
+
+    - `should_run(frame)` compares a tiny grayscale thumbnail with the one from the last
+      inference; a static scene is not re-detected (except every STATIC_REFRESH seconds).
+    - `record(latency)` keeps a moving average of inference time. Over budget, the input size
+      steps down and, at the smallest size, the rate is lowered; well under budget, the rate
+      recovers first and then the size steps back up.
+    """
+
+    def __init__(self, sizes=INPUT_SIZES, latency_budget=LATENCY_BUDGET, max_rate=10.0, min_rate=1.0,
+                 change_threshold=CHANGE_THRESHOLD, static_refresh=STATIC_REFRESH):
+        self.sizes = sorted(sizes)
+        self.latency_budget = latency_budget
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.change_threshold = change_threshold
+        self.static_refresh = static_refresh
+        self.reset()
+
+    def reset(self):
+        self.level = len(self.sizes) - 1  # Start at full size; the first measurements bring it down if needed
+        self.rate = self.max_rate
+        self.latency = None  # Moving average of inference seconds
+        self.skipped = 0  # Frames not inferred because the scene had not changed
+        self._thumb = None
+        self._last_run = 0.0
+        self._warming = True  # The first inference at a new size includes warm-up; ignore it
+
+    @property
+    def size(self):
+        return self.sizes[self.level]
+
+    def use_sizes(self, sizes):
+        """Restrict the governor to the input sizes the detector actually has (e.g. exported models)."""
+        sizes = sorted(sizes)
+        if sizes == self.sizes:
+            return
+        current = self.size
+        self.sizes = sizes
+        self.level = max((i for i, size in enumerate(sizes) if size <= current), default=0)
+
+    def should_run(self, frame):
+        """True if `frame` differs enough from the last inferred frame (or a refresh is due)."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumb = cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+        now = time.monotonic()
+
+        if (self._thumb is not None and now - self._last_run < self.static_refresh
+                and np.abs(thumb - self._thumb).mean() < self.change_threshold):
+            self.skipped += 1
+            return False  # ✅ Static scene: keep the previous detections
+
+        self._thumb, self._last_run = thumb, now
+        return True
+
+    def record(self, latency):
+        """Feed one measured inference time; adjusts `size` and `rate` for the next frames."""
+        if self._warming:
+            self._warming = False
+            return
+        self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+
+        if self.latency > self.latency_budget:
+            if self.level > 0:
+                self._set_level(self.level - 1)
+            else:
+                self.rate = max(self.min_rate, self.rate * 0.75)
+        elif self.latency < 0.5 * self.latency_budget:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate * 1.25)
+            elif self.level < len(self.sizes) - 1:
+                self._set_level(self.level + 1)
+
+    def _set_level(self, level):
+        previous = self.sizes[self.level]
+        self.level = level
+        # Latency scales roughly with input area; rescale the average so it does not step twice
+        self.latency *= (self.sizes[level] / previous) ** 2
+        self._warming = True
+        print(f"⚙️ Detector input {previous} -> {self.sizes[level]} (avg {self.latency * 1000:.0f} ms)")
@@ -0,0 +1,110 @@
+from collections import namedtuple
+import cv2
+import numpy as np
+
+ANALYSIS_SIDE = 600  # Page finding and skew estimation run on a copy downscaled to this longer side
+MIN_PAGE_AREA = 0.2  # A page outline must cover at least this fraction of the frame
+MAX_SKEW = 15.0  # Degrees; larger estimates are treated as noise (e.g. a photo of a tilted table)
+MIN_SKEW = 0.3  # Degrees below which the page is left unrotated
+MIN_LINE_LENGTH = 40  # Pixels (at ANALYSIS_SIDE) a blob must span to count as a text line for skew
+MIN_SKEW_LINES = 3  # Fewer line blobs than this and the page is left unrotated
+SHARPNESS_REFERENCE = 150.0  # Variance of the Laplacian that counts as fully sharp
+CONTRAST_REFERENCE = 30.0  # Grey-level standard deviation that counts as full contrast
+QUALITY_THRESHOLD = 0.45  # Below this the user is asked to hold steady instead of running OCR
+
+# image = what OCR should read; quality in [0, 1]; corners = page outline in the input frame (or None)
+PreparedPage = namedtuple("PreparedPage", ["image", "quality", "corners", "skew", "sharpness"])
+
+def _downscale(gray):
+    height, width = gray.shape[:2]
+    scale = min(1.0, ANALYSIS_SIDE / max(height, width))
+    if scale == 1.0:
+        return gray, 1.0
+    return cv2.resize(gray, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA), scale
+
+def order_corners(points):
+    """Four (x, y) points as top-left, top-right, bottom-right, bottom-left."""
+    points = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    sums, diffs = points.sum(axis=1), np.diff(points, axis=1).ravel()
+    return np.float32([points[sums.argmin()], points[diffs.argmin()], points[sums.argmax()], points[diffs.argmax()]])
+
+def find_page(gray):
+    """Corners of the largest four-sided outline (the page), in full-frame pixels, or None."""
+    small, scale = _downscale(gray)
+    edges = cv2.Canny(cv2.GaussianBlur(small, (5, 5), 0), 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = MIN_PAGE_AREA * small.shape[0] * small.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        outline = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(outline) == 4 and cv2.isContourConvex(outline):
+            return order_corners(outline) / scale
+    return None
+
+def warp_page(gray, corners):
+    """Perspective-correct the page to a flat, front-on rectangle."""
+    tl, tr, br, bl = corners
+    width = int(max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl)))
+    height = int(max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr)))
+    target = np.float32([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]])
+    return cv2.warpPerspective(gray, cv2.getPerspectiveTransform(corners, target), (width, height),
+                               flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+def estimate_skew(gray):
+    """Rotation in degrees that levels the text lines: the median angle of the individual line blobs."""
+    small, _ = _downscale(gray)
+    ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+    ink = cv2.morphologyEx(ink, cv2.MORPH_CLOSE, np.ones((3, 15), np.uint8))  # Letters -> line blobs
+    contours, _ = cv2.findContours(ink, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    angles = []
+    for contour in contours:
+        (_, _), (w, h), angle = cv2.minAreaRect(contour)
+        if w < h:  # OpenCV reports the angle of the box's first side; normalise to the long side
+            w, h, angle = h, w, angle - 90.0
+        if w < MIN_LINE_LENGTH or w < 3 * h:
+            continue  # Stray marks, single letters, pictures: not a line of text
+        angle = (angle + 90.0) % 180.0 - 90.0
+        if abs(angle) <= MAX_SKEW:
+            angles.append(angle)
+    if len(angles) < MIN_SKEW_LINES:
+        return 0.0
+    return float(np.median(angles))
+
+def deskew(gray, angle):
+    if abs(angle) < MIN_SKEW:
+        return gray
+    height, width = gray.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+def binarize(gray):
+    """Adaptive (local mean) threshold: black text on white under uneven lighting and shadows."""
+    block = max(15, (min(gray.shape[:2]) // 40) | 1)  # Odd window of roughly a few text heights
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block, 10)
+
+def quality_score(gray):
+    """(score in [0, 1], sharpness): focus times contrast, so OCR is not wasted on blurry, dark or washed-out frames."""
+    small, _ = _downscale(gray)
+    sharpness = float(cv2.Laplacian(small, cv2.CV_32F).var())
+    focus = min(1.0, sharpness / SHARPNESS_REFERENCE)
+    contrast = min(1.0, float(small.std()) / CONTRAST_REFERENCE)
+    return focus * contrast, sharpness
+
+def prepare_document(gray):
+    """Page contour -> perspective warp -> deskew -> adaptive binarisation, plus a quality score.
+
+    When the quality is below QUALITY_THRESHOLD the other steps are skipped (image is None):
+    the caller should ask the user to hold steady rather than run OCR.
+    """
+    quality, sharpness = quality_score(gray)
+    if quality < QUALITY_THRESHOLD:
+        return PreparedPage(None, quality, None, 0.0, sharpness)
+
+    corners = find_page(gray)
+    page = warp_page(gray, corners) if corners is not None else gray
+    skew = estimate_skew(page)
+    return PreparedPage(binarize(deskew(page, skew)), quality, corners, skew, sharpness)
@@ -0,0 +1,198 @@
+import numpy as np
+
+LBP_GRID = 7  # Face split into 7x7 cells, one uniform-LBP histogram per cell
+LBP_BINS = 59  # 58 uniform patterns + 1 bucket for all non-uniform ones
+EMBEDDING_DIM = LBP_GRID * LBP_GRID * LBP_BINS
+
+DEFAULT_THRESHOLD = 0.80  # Cosine similarity an identity must reach when nothing else is close to it
+THRESHOLD_MARGIN = 0.02  # Required gap above the closest other identity
+MAX_THRESHOLD = 0.90  # Ceiling: genuine matches score ~0.95+, so a crowded roster never locks users out
+ANN_MIN_SIZE = 5000  # Roster size (samples) from which the optional hnswlib index is used
+
+_NEIGHBOURS = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
+
+def _uniform_table():
+    """Map each 8-bit LBP code to its uniform-pattern bin (<= 2 bit transitions) or the shared last bin."""
+    table = np.full(256, LBP_BINS - 1, dtype=np.int32)
+    index = 0
+    for code in range(256):
+        bits = [(code >> i) & 1 for i in range(8)]
+        if sum(bits[i] != bits[(i + 1) % 8] for i in range(8)) <= 2:
+            table[code] = index
+            index += 1
+    return table
+
+UNIFORM_TABLE = _uniform_table()
+
+def lbp_embeddings(faces):
+    """Embed a stack of equally sized grayscale faces, shape (N, H, W), in one vectorized pass.
+
+    Each face becomes the concatenated per-cell uniform-LBP histograms, square-rooted and
+    L2-normalised, so a dot product between two embeddings is a Hellinger (Bhattacharyya) similarity.
+    """
+    faces = np.asarray(faces)
+    if faces.ndim == 2:
+        faces = faces[None]
+    count, height, width = faces.shape
+
+    f = faces.astype(np.int16)
+    center = f[:, 1:-1, 1:-1]
+    codes = np.zeros(center.shape, dtype=np.int32)
+    for bit, (dy, dx) in enumerate(_NEIGHBOURS):
+        neighbour = f[:, 1 + dy:height - 1 + dy, 1 + dx:width - 1 + dx]
+        codes |= (neighbour >= center).astype(np.int32) << bit
+
+    # Crop to a whole number of cells, then give every pixel a global bin id: (face, cell, pattern)
+    cell_h, cell_w = codes.shape[1] // LBP_GRID, codes.shape[2] // LBP_GRID
+    codes = UNIFORM_TABLE[codes[:, :cell_h * LBP_GRID, :cell_w * LBP_GRID]]
+    rows = np.arange(cell_h * LBP_GRID) // cell_h
+    cols = np.arange(cell_w * LBP_GRID) // cell_w
+    cell = (rows[:, None] * LBP_GRID + cols[None, :])[None]
+    face = np.arange(count)[:, None, None]
+    bins = (face * LBP_GRID * LBP_GRID + cell) * LBP_BINS + codes
+
+    hist = np.bincount(bins.ravel(), minlength=count * EMBEDDING_DIM).reshape(count, EMBEDDING_DIM)
+    embeddings = np.sqrt(hist.astype(np.float32))
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+    return embeddings
+
+class FaceIndex:
+    """L2-normalised face embeddings in one contiguous matrix, queried with a single matrix multiply.
+
+    Each identity (integer label) gets its own acceptance threshold, calibrated from how close its
+    samples are to everyone else's. Past ANN_MIN_SIZE samples an hnswlib graph is used when installed.
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM, ann_min_size=ANN_MIN_SIZE):
+        self.dim = dim
+        self.ann_min_size = ann_min_size
+        self._matrix = np.empty((0, dim), dtype=np.float32)  # Capacity grows by doubling; rows [:size] are live
+        self._labels = np.empty(0, dtype=np.int32)
+        self.size = 0
+        self.thresholds = np.empty(0, dtype=np.float32)  # Indexed by label
+        self._ann = None
+
+    @property
+    def embeddings(self):
+        return self._matrix[:self.size]
+
+    @property
+    def labels(self):
+        return self._labels[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def add(self, labels, embeddings, calibrate=True):
+        """Append samples (labels shape (N,), embeddings shape (N, dim)) and update thresholds incrementally."""
+        labels = np.asarray(labels, dtype=np.int32).reshape(-1)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(-1, self.dim)
+
+        self._reserve(self.size + len(labels))
+        if labels.max() >= len(self.thresholds):
+            grown = np.full(labels.max() + 1, DEFAULT_THRESHOLD, dtype=np.float32)
+            grown[:len(self.thresholds)] = self.thresholds
+            self.thresholds = grown
+
+        # ✅ Only the new rows against the existing ones: O(N) per enrollment, not a recalibration
+        if calibrate and self.size:
+            self._raise_thresholds(self.labels, self.embeddings, labels, embeddings)
+        if calibrate:
+            self._raise_thresholds(labels, embeddings, labels, embeddings)
+
+        start = self.size
+        self._matrix[start:start + len(labels)] = embeddings
+        self._labels[start:start + len(labels)] = labels
+        self.size += len(labels)
+
+        if self._ann is not None:
+            self._ann.resize_index(self._matrix.shape[0])
+            self._ann.add_items(embeddings, np.arange(start, self.size))
+
+    def _reserve(self, capacity):
+        if capacity <= self._matrix.shape[0]:
+            return
+        capacity = max(capacity, 2 * self._matrix.shape[0], 16)
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        matrix[:self.size] = self.embeddings
+        labels = np.empty(capacity, dtype=np.int32)
+        labels[:self.size] = self.labels
+        self._matrix, self._labels = matrix, labels
+
+    def _raise_thresholds(self, labels_a, emb_a, labels_b, emb_b, block=1024):
+        """Push each identity's threshold above its closest *other* identity (impostor) plus a margin.
+
+        Capped at MAX_THRESHOLD: in a large roster some impostor always scores high, and past the
+        cap the nearest-neighbour label (and the vote margin) has to tell users apart instead.
+        """
+        for start in range(0, len(labels_b), block):
+            sims = emb_b[start:start + block] @ emb_a.T
+            sims[labels_b[start:start + block, None] == labels_a[None, :]] = -1.0  # Ignore genuine pairs
+            closest = sims.max(axis=1) + THRESHOLD_MARGIN
+            np.maximum.at(self.thresholds, labels_b[start:start + block], closest)
+            np.maximum.at(self.thresholds, labels_a, sims.max(axis=0) + THRESHOLD_MARGIN)
+        np.minimum(self.thresholds, MAX_THRESHOLD, out=self.thresholds)
+
+    def calibrate(self):
+        """Recompute every identity's threshold from scratch (after bulk loading)."""
+        self.thresholds[:] = DEFAULT_THRESHOLD
+        self._raise_thresholds(self.labels, self.embeddings, self.labels, self.embeddings)
+
+    def search(self, queries, k=1):
+        """Top-k nearest samples for each query row: returns (labels (M, k), similarities (M, k))."""
+        queries = np.ascontiguousarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        k = min(k, self.size)
+        if k == 0:
+            return np.full((len(queries), 0), -1, dtype=np.int32), np.empty((len(queries), 0), dtype=np.float32)
+
+        ann = self._ann_index()
+        if ann is not None:
+            rows, distances = ann.knn_query(queries, k=k)
+            return self.labels[rows.astype(np.int64)], 1.0 - distances
+
+        sims = queries @ self.embeddings.T  # ✅ One batched matmul for all queries
+        if k < self.size:
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(self.size), sims.shape).copy()
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return self.labels[top], np.take_along_axis(top_sims, order, axis=1)
+
+    def identify(self, queries):
+        """Best identity per query: returns (labels, similarities, accepted) arrays; label -1 if empty."""
+        labels, sims = self.search(queries, k=1)
+        if labels.shape[1] == 0:
+            count = len(labels)
+            return np.full(count, -1), np.zeros(count, dtype=np.float32), np.zeros(count, dtype=bool)
+        labels, sims = labels[:, 0], sims[:, 0]
+        return labels, sims, sims >= self.thresholds[labels]
+
+    def _ann_index(self):
+        """Build the approximate index lazily once the roster is large enough (hnswlib is optional)."""
+        if self._ann is not None or self.size < self.ann_min_size:
+            return self._ann
+        try:
+            import hnswlib
+        except ImportError:
+            return None  # Exact search still works; it just scales linearly
+        ann = hnswlib.Index(space="ip", dim=self.dim)
+        ann.init_index(max_elements=self._matrix.shape[0], ef_construction=200, M=16)
+        ann.add_items(self.embeddings, np.arange(self.size))
+        ann.set_ef(64)
+        self._ann = ann
+        return ann
+
+    def save(self, path):
+        np.savez(path, embeddings=self.embeddings, labels=self.labels, thresholds=self.thresholds)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        index = cls(dim=data["embeddings"].shape[1])
+        index._matrix = np.ascontiguousarray(data["embeddings"], dtype=np.float32)
+        index._labels = data["labels"].astype(np.int32)
+        index.size = len(index._labels)
+        index.thresholds = data["thresholds"].astype(np.float32)
+        return index
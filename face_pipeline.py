@@ -0,0 +1,78 @@
+import math
+from collections import namedtuple
+import cv2
+import numpy as np
+from face_index import lbp_embeddings
+from face_store import FACE_SIZE
+
+MIN_FACE_SIZE = 20  # Faces smaller than this (pixels) are ignored
+EYE_Y = 0.40  # Canonical eye height in the aligned crop, as a fraction of its height
+EYE_SPACING = 0.30  # Canonical distance between the eyes, as a fraction of the crop width
+
+FaceMatch = namedtuple("FaceMatch", ["label", "score", "accepted", "box"])  # box = (x, y, w, h) in frame pixels
+
+def detect_faces(detector, rgb_frame):
+    """Run MediaPipe once on the frame; returns [(box, eyes)] with eyes = ((x, y), (x, y)) or None."""
+    results = detector.process(rgb_frame)
+    frame_h, frame_w = rgb_frame.shape[:2]
+    faces = []
+    for detection in results.detections or []:
+        bboxC = detection.location_data.relative_bounding_box
+        x = min(max(0, int(bboxC.xmin * frame_w)), frame_w - 1)
+        y = min(max(0, int(bboxC.ymin * frame_h)), frame_h - 1)
+        w = min(max(1, int(bboxC.width * frame_w)), frame_w - x)
+        h = min(max(1, int(bboxC.height * frame_h)), frame_h - y)
+        if w <= MIN_FACE_SIZE or h <= MIN_FACE_SIZE:
+            continue
+
+        keypoints = detection.location_data.relative_keypoints
+        eyes = None
+        if len(keypoints) >= 2:  # MediaPipe: 0 = right eye, 1 = left eye (as seen in the image: left, right)
+            eyes = ((keypoints[0].x * frame_w, keypoints[0].y * frame_h),
+                    (keypoints[1].x * frame_w, keypoints[1].y * frame_h))
+        faces.append(((x, y, w, h), eyes))
+    return faces
+
+def alignment_matrix(box, eyes, size=FACE_SIZE):
+    """Similarity transform taking a face in the frame to an upright, fixed-size crop."""
+    out_w, out_h = size
+    if eyes is None:
+        x, y, w, h = box  # No landmarks: plain crop-and-scale of the box
+        return np.float32([[out_w / w, 0, -x * out_w / w], [0, out_h / h, -y * out_h / h]])
+
+    (x0, y0), (x1, y1) = eyes
+    eye_distance = max(math.hypot(x1 - x0, y1 - y0), 1.0)
+    angle = math.degrees(math.atan2(y1 - y0, x1 - x0))
+    scale = EYE_SPACING * out_w / eye_distance
+    center = ((x0 + x1) / 2, (y0 + y1) / 2)
+
+    matrix = cv2.getRotationMatrix2D(center, angle, scale)
+    matrix[0, 2] += out_w / 2 - center[0]
+    matrix[1, 2] += out_h * EYE_Y - center[1]
+    return matrix
+
+def align_faces(gray_frame, faces, size=FACE_SIZE):
+    """Crop and align every face into one stacked (N, H, W) uint8 array, one warp per face."""
+    stack = np.empty((len(faces), size[1], size[0]), dtype=np.uint8)
+    for i, (box, eyes) in enumerate(faces):
+        cv2.warpAffine(gray_frame, alignment_matrix(box, eyes, size), size, dst=stack[i],
+                       flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    return stack
+
+def recognize_faces(index, gray_frame, faces):
+    """Identify already-detected faces [(box, eyes)]: returns (labels, scores, accepted) arrays."""
+    stack = align_faces(gray_frame, faces)
+    return index.identify(lbp_embeddings(stack))  # ✅ Whole batch in one call
+
+def identify_faces(detector, index, frame):
+    """Detect, align, embed and identify every face in a BGR frame with one batched index query.
+
+    Returns a FaceMatch per face (label -1 when nothing is enrolled).
+    """
+    faces = detect_faces(detector, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    if not faces:
+        return []
+
+    labels, scores, accepted = recognize_faces(index, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), faces)
+    return [FaceMatch(int(label), float(score), bool(ok), box)
+            for label, score, ok, (box, eyes) in zip(labels, scores, accepted, faces)]
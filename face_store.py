@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import cv2
+from face_index import FaceIndex, lbp_embeddings
+from model_registry import models
+
+FACE_MODEL_VERSION = 5  # Bump when the training recipe changes so stale models are retrained
+FACE_SIZE = (200, 200)  # Every enrolled and scanned face is resized to this
+SNAPSHOT_EVERY = 25  # Enrollments kept in the journal before the model file is rewritten
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+class FaceModelStore:
+    """Face identification index persisted together with its label map and a hash of the enrolled images.
+
+    `trained_faces.npz` holds a snapshot of the FaceIndex and `trained_faces.json` the metadata:
+    label map, per-file hashes, and a journal of images enrolled since the snapshot. Enrolling a user
+    only embeds and appends that user's samples and adds them to the journal, so sign-up cost does not
+    grow with the roster; the snapshot is rewritten every SNAPSHOT_EVERY enrollments. Any other change
+    to `images/` (removed or replaced image) triggers a full rebuild on the next load.
+    """
+
+    def __init__(self, folder_path="images", model_path="trained_faces.npz", meta_path="trained_faces.json"):
+        self.folder_path = folder_path
+        self.model_path = model_path
+        self.meta_path = meta_path
+
+    def list_images(self):
+        """Enrolled image file names, in a stable order."""
+        if not os.path.exists(self.folder_path):
+            os.makedirs(self.folder_path)
+        return sorted(f for f in os.listdir(self.folder_path) if f.endswith(IMAGE_EXTENSIONS))
+
+    def file_record(self, file_name, known=None):
+        """[size, mtime_ns, sha256] for one image; reuses `known` if size and mtime are unchanged."""
+        stat = os.stat(os.path.join(self.folder_path, file_name))
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known
+        with open(os.path.join(self.folder_path, file_name), "rb") as f:
+            return [stat.st_size, stat.st_mtime_ns, hashlib.sha256(f.read()).hexdigest()]
+
+    def fingerprint(self, file_names, known_files=None):
+        """Return (content hash of the enrolled images, per-file records).
+
+        A file is only re-hashed when its size or modification time differs from `known_files`,
+        so an unchanged roster costs one stat() per image.
+        """
+        known_files = known_files or {}
+        files = {name: self.file_record(name, known_files.get(name)) for name in file_names}
+        return content_hash(files), files
+
+    def read_meta(self):
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load_or_train(self):
+        """Return (FaceIndex or None, label_map), rebuilding only if enrollment changed."""
+        meta = self.read_meta()
+        file_names = self.list_images()
+        digest, files = self.fingerprint(file_names, meta.get("files"))
+
+        if (meta.get("version") == FACE_MODEL_VERSION and meta.get("hash") == digest
+                and os.path.exists(self.model_path)):
+            index = FaceIndex.load(self.model_path)
+            label_map = {int(label): name for label, name in meta["label_map"].items()}
+            labels_by_name = {name: label for label, name in label_map.items()}
+
+            journal = meta.get("journal", [])
+            samples, labels = [], []
+            for file_name in journal:
+                image = self.read_face(file_name)
+                if image is not None:
+                    samples.append(image)
+                    labels.append(labels_by_name[os.path.splitext(file_name)[0]])
+            if samples:
+                # ✅ Replay enrollments made since the snapshot instead of rebuilding everyone
+                index.add(labels, lbp_embeddings(samples))
+                if len(journal) >= SNAPSHOT_EVERY:
+                    self.snapshot(index, meta)
+
+            print("✅ Face model loaded from disk (enrollment unchanged)")
+            return (index if len(index) else None), label_map
+
+        print("🔄 Enrollment changed; rebuilding face model")
+        return self.train(file_names, digest, files)
+
+    def read_face(self, file_name):
+        """The enrolled face, detected and eye-aligned exactly like a scanned one (whole image if none is found)."""
+        from face_pipeline import align_faces, detect_faces  # Deferred: face_pipeline imports this module
+        image = cv2.imread(os.path.join(self.folder_path, file_name), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            return None
+        faces = detect_faces(models.get("face_detector"), cv2.cvtColor(image, cv2.COLOR_GRAY2RGB))
+        if not faces:
+            print(f"⚠️ No face found in {file_name}; enrolling the whole image")
+            return cv2.resize(image, FACE_SIZE)
+        largest = max(faces, key=lambda face: face[0][2] * face[0][3])  # The person signing up, not bystanders
+        return align_faces(image, [largest])[0]
+
+    def train(self, file_names, digest, files):
+        """Embed every enrolled image in one batch and persist the index, label map and hash."""
+        known_faces, labels, label_map = [], [], {}
+        for file_name in file_names:
+            image = self.read_face(file_name)
+            if image is not None:
+                known_faces.append(image)
+                labels.append(len(label_map))
+                label_map[len(label_map)] = os.path.splitext(file_name)[0]
+
+        index = None
+        if known_faces:
+            index = FaceIndex()
+            index.add(labels, lbp_embeddings(known_faces))  # Calibrates per-identity thresholds too
+            self._replace(self.model_path, index.save)
+
+        meta = {"version": FACE_MODEL_VERSION, "hash": digest, "files": files, "journal": [],
+                "label_map": {str(label): name for label, name in label_map.items()}}
+        self.write_meta(meta)
+        return index, label_map
+
+    def enroll(self, file_name):
+        """Add one newly saved image from `images/` without retraining the other users.
+
+        Updates the in-memory model if it is loaded and records the image in the journal so the
+        next launch replays it on top of the snapshot.
+        """
+        meta = self.read_meta()
+        files = meta.get("files", {})
+        if meta.get("version") != FACE_MODEL_VERSION or file_name in files or not os.path.exists(self.model_path):
+            models.reload("face_model")  # Replaced image or no snapshot yet: fall back to a full rebuild
+            return
+
+        image = self.read_face(file_name)
+        if image is None:
+            return
+
+        label_map = meta["label_map"]
+        label = max((int(l) for l in label_map), default=-1) + 1
+        name = os.path.splitext(file_name)[0]
+
+        files[file_name] = self.file_record(file_name)
+        label_map[str(label)] = name
+        meta["hash"] = content_hash(files)
+        meta.setdefault("journal", []).append(file_name)
+
+        if models.is_loaded("face_model"):
+            index, loaded_labels = models.get("face_model")
+            if index is None:
+                models.reload("face_model")
+                return
+            index.add([label], lbp_embeddings([image]))
+            loaded_labels[label] = name  # Same dict the pages read from
+            if len(meta["journal"]) >= SNAPSHOT_EVERY:
+                self.snapshot(index, meta)
+                return
+
+        self.write_meta(meta)
+        print(f"✅ Enrolled {name} incrementally (label {label})")
+
+    def snapshot(self, index, meta):
+        """Rewrite the model file with everything enrolled so far and clear the journal."""
+        self._replace(self.model_path, index.save)
+        meta["journal"] = []
+        self.write_meta(meta)
+
+    def write_meta(self, meta):
+        """Written after the model file: the metadata is what marks a snapshot valid."""
+        self._replace(self.meta_path, lambda path: self._write_json(path, meta))
+
+    @staticmethod
+    def _write_json(path, data):
+        with open(path, "w") as f:
+            json.dump(data, f, indent=1)
+
+    @staticmethod
+    def _replace(path, write):
+        """Write through a temp file so a crash never leaves a half-written model."""
+        root, ext = os.path.splitext(path)
+        tmp_path = f"{root}.tmp{ext}"  # Keep the extension: np.savez would otherwise append ".npz"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+def content_hash(files):
+    """Hash of the whole roster from the per-file records (order-independent)."""
+    digest = hashlib.sha256()
+    for file_name in sorted(files):
+        digest.update(file_name.encode("utf-8"))
+        digest.update(files[file_name][2].encode("ascii"))
+    return digest.hexdigest()
+
+store = FaceModelStore()
+
+# ✅ One index and label map shared by face login and face scanning
+models.register("face_model", store.load_or_train)
@@ -0,0 +1,121 @@
+import itertools
+import cv2
+import numpy as np
+from face_pipeline import detect_faces, recognize_faces
+
+def iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes."""
+    ix = max(0.0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+class Track:
+    """One face followed across frames, with a constant-velocity motion model."""
+    _ids = itertools.count(1)
+
+    def __init__(self, box, eyes, frame_count):
+        self.id = next(Track._ids)
+        self.box = np.array(box, dtype=np.float32)  # x, y, w, h
+        self.eyes = eyes
+        self.velocity = np.zeros(2, dtype=np.float32)  # Pixels per frame
+        self.last_seen = frame_count  # Frame in which a detection last matched this track
+        self.misses = 0  # Detection rounds in a row without a match
+        self.label = None  # None = not recognized yet
+        self.score = 0.0
+        self.accepted = False
+        self.verified_at = None  # Frame of the last recognition
+        self.announced = False  # Set by the page once this identity has been spoken
+
+    def predict(self):
+        """Advance the box one frame along its estimated velocity."""
+        self.box[:2] += self.velocity
+
+    def correct(self, box, eyes, frame_count):
+        """Snap to a new detection and re-estimate the velocity (smoothed)."""
+        box = np.array(box, dtype=np.float32)
+        frames = max(1, frame_count - self.last_seen)
+        measured = (box[:2] - (self.box[:2] - self.velocity * frames)) / frames
+        self.velocity = 0.5 * self.velocity + 0.5 * measured
+        self.box, self.eyes = box, eyes
+        self.last_seen, self.misses = frame_count, 0
+
+    def assign(self, label, score, accepted, frame_count):
+        if label != self.label:
+            self.announced = False  # A different person now: allow a new announcement
+        self.label, self.score, self.accepted = label, score, accepted
+        self.verified_at = frame_count
+
+class FaceTracker:
+    """Carries face identities between frames so detection and recognition run only when needed.
+
+    - The detector runs every `detect_every` frames (every frame while nothing is tracked);
+      in between, tracks are moved by their motion model.
+    - Recognition runs only for new tracks and for tracks not verified for `reverify_every` frames,
+      all in one batch.
+    """
+
+    def __init__(self, iou_threshold=0.3, detect_every=5, reverify_every=30, max_misses=3):
+        self.iou_threshold = iou_threshold
+        self.detect_every = detect_every
+        self.reverify_every = reverify_every
+        self.max_misses = max_misses
+        self.tracks = []
+        self.frame_count = 0
+        self.detector_calls = 0
+        self.recognizer_calls = 0
+
+    def reset(self):
+        self.tracks = []
+
+    def step(self, frame, detector, index):
+        """Process one BGR frame; returns the current tracks."""
+        self.frame_count += 1
+        for track in self.tracks:
+            track.predict()
+
+        if self.tracks and self.frame_count % self.detect_every:
+            return self.tracks  # ✅ Steady scene: motion model only, no detector or recognizer call
+
+        self.detector_calls += 1
+        faces = detect_faces(detector, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        seen = self._associate(faces)
+
+        due = [track for track in seen if track.verified_at is None
+               or self.frame_count - track.verified_at >= self.reverify_every]
+        if due:
+            self.recognizer_calls += 1
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            labels, scores, accepted = recognize_faces(index, gray, [(tuple(t.box), t.eyes) for t in due])
+            for track, label, score, ok in zip(due, labels, scores, accepted):
+                track.assign(int(label), float(score), bool(ok), self.frame_count)
+        return self.tracks
+
+    def _associate(self, faces):
+        """Greedy IoU matching of detections to predicted tracks; returns the tracks seen this frame."""
+        pairs = sorted(((iou(track.box, box), t, d) for t, track in enumerate(self.tracks)
+                        for d, (box, eyes) in enumerate(faces)), reverse=True)
+        used_tracks, used_faces, seen = set(), set(), []
+        for overlap, t, d in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if t in used_tracks or d in used_faces:
+                continue
+            used_tracks.add(t)
+            used_faces.add(d)
+            box, eyes = faces[d]
+            self.tracks[t].correct(box, eyes, self.frame_count)
+            seen.append(self.tracks[t])
+
+        for t, track in enumerate(self.tracks):
+            if t not in used_tracks:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+
+        for d, (box, eyes) in enumerate(faces):
+            if d not in used_faces:
+                track = Track(box, eyes, self.frame_count)
+                self.tracks.append(track)
+                seen.append(track)
+        return seen
@@ -0,0 +1,64 @@
+from collections import deque
+
+UNKNOWN = -1  # Pseudo-label collecting evidence from faces that matched nobody
+
+class VoteAccumulator:
+    """Streaming per-identity evidence for face login, with decay and an early decision.
+
+    Every observed face adds its similarity to a running score: to its label when the match was
+    accepted, to UNKNOWN when it was not. All scores decay by `decay` per frame, so a stray
+    low-confidence frame weakens a candidate instead of wiping it out, and old evidence fades.
+    The posterior of a label is its share of the total score; a decision is made as soon as the
+    best identity leads the runner-up (UNKNOWN included) by `margin` and has at least
+    `min_evidence` behind it.
+    """
+
+    def __init__(self, decay=0.85, margin=0.5, min_evidence=2.0, trace_size=200):
+        self.decay = decay
+        self.margin = margin
+        self.min_evidence = min_evidence
+        self.trace = deque(maxlen=trace_size)  # One entry per frame, for tuning the parameters
+        self.reset()
+
+    def reset(self):
+        self.scores = {}
+        self.frames = 0
+        self.decision = None
+        self.trace.clear()
+
+    def posteriors(self):
+        total = sum(self.scores.values())
+        return {label: score / total for label, score in self.scores.items()} if total > 0 else {}
+
+    def update(self, observations, seq=None):
+        """Add one frame's [(label, score, accepted)]; returns the decided label or None.
+
+        Costs O(identities seen so far), however many frames came before.
+        """
+        self.frames += 1
+        for label in self.scores:
+            self.scores[label] *= self.decay
+        for label, score, accepted in observations:
+            key = label if accepted else UNKNOWN
+            self.scores[key] = self.scores.get(key, 0.0) + max(0.0, score)
+
+        posteriors = self.posteriors()
+        ranked = sorted(posteriors.items(), key=lambda item: item[1], reverse=True)
+        best, best_p = ranked[0] if ranked else (None, 0.0)
+        lead = best_p - (ranked[1][1] if len(ranked) > 1 else 0.0)
+
+        if (best is not None and best != UNKNOWN and lead >= self.margin
+                and self.scores[best] >= self.min_evidence):
+            self.decision = best
+
+        self.trace.append({
+            "frame": self.frames,
+            "seq": seq,
+            "observations": [(int(l), round(float(s), 4), bool(a)) for l, s, a in observations],
+            "best": best,
+            "posterior": round(best_p, 4),
+            "lead": round(lead, 4),
+            "evidence": round(self.scores.get(best, 0.0), 4),
+            "decision": self.decision,
+        })
+        return self.decision
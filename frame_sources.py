@@ -0,0 +1,208 @@
+import os
+import platform
+import time
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+class FrameSource:
+    """Something CameraManager can read frames from: a camera, a clip, a folder or a generator.
+
+    Replay sources follow a fixed timeline of `fps` frames per second scaled by `speed`
+    (1.0 = real time, 2.0 = twice as fast, 0 = as fast as possible), so a run is
+    deterministic regardless of how fast the consumers are.
+    """
+    fps = 30.0
+
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self.frame_index = 0  # Index of the next frame on the timeline
+        self.finished = False  # True once a non-looping replay has run out of frames
+        self._start = None
+
+    def is_opened(self):
+        return True
+
+    def set_resolution(self, width, height):
+        """Request a capture size; returns the (width, height) the source will actually deliver."""
+        return width, height
+
+    def read(self, out=None):
+        """Return (ok, frame). Writes into `out` when the sizes match, like VideoCapture.retrieve."""
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def frame_time(self):
+        """Timeline position (seconds) of the frame most recently read."""
+        return max(0, self.frame_index - 1) / self.fps
+
+    def _pace(self):
+        """Sleep until the next frame is due on the replay timeline."""
+        if not self.speed:
+            return
+        if self._start is None:
+            self._start = time.monotonic()
+        delay = self._start + self.frame_index / (self.fps * self.speed) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _finish(self):
+        self.finished = True
+        return False, None
+
+def device_backend():
+    """Pick the OpenCV capture backend for this OS."""
+    system = platform.system().lower()
+    if "windows" in system:
+        return cv2.CAP_DSHOW  # ✅ DirectShow for better Windows compatibility
+    if "darwin" in system:
+        return cv2.CAP_AVFOUNDATION
+    if "linux" in system:
+        return cv2.CAP_V4L2
+    return cv2.CAP_ANY
+
+class DeviceSource(FrameSource):
+    """Live camera; the device paces itself."""
+
+    def __init__(self, index=0):
+        super().__init__(speed=0)
+        self.capture = cv2.VideoCapture(index, device_backend())
+        if not self.capture.isOpened():
+            self.capture = cv2.VideoCapture(index, cv2.CAP_ANY)  # Fall back to whatever OpenCV finds
+
+    def is_opened(self):
+        return self.capture.isOpened()
+
+    def set_resolution(self, width, height):
+        if self.capture.isOpened():
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        return (int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)) or width,
+                int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) or height)
+
+    def read(self, out=None):
+        if not self.capture.grab():
+            return False, None
+        self.frame_index += 1
+        return self.capture.retrieve(out)
+
+    def release(self):
+        if self.capture.isOpened():
+            self.capture.release()
+
+class VideoFileSource(FrameSource):
+    """Recorded clip, replayed at its own frame rate times `speed`."""
+
+    def __init__(self, path, speed=1.0, loop=False):
+        super().__init__(speed)
+        self.path = path
+        self.loop = loop
+        self.capture = cv2.VideoCapture(path)
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or FrameSource.fps
+
+    def is_opened(self):
+        return self.capture.isOpened()
+
+    def set_resolution(self, width, height):
+        # A clip has a fixed size; CameraManager resizes for consumers that need something else
+        return (int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)) or width,
+                int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) or height)
+
+    def read(self, out=None):
+        self._pace()
+        ok, frame = self.capture.read(out)
+        if not ok and self.loop and self.frame_index:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read(out)
+        if not ok:
+            return self._finish()
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        if self.capture.isOpened():
+            self.capture.release()
+
+class ImageDirectorySource(FrameSource):
+    """Folder of still images replayed in file-name order as a `fps` stream."""
+
+    def __init__(self, folder_path, speed=1.0, loop=False, fps=None):
+        super().__init__(speed)
+        self.loop = loop
+        if fps:
+            self.fps = fps
+        self.paths = sorted(
+            os.path.join(folder_path, name) for name in os.listdir(folder_path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+
+    def is_opened(self):
+        return bool(self.paths)
+
+    def set_resolution(self, width, height):
+        first = cv2.imread(self.paths[0]) if self.paths else None
+        if first is None:
+            return width, height
+        return first.shape[1], first.shape[0]
+
+    def read(self, out=None):
+        if self.frame_index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return self._finish()
+            self.frame_index = 0
+            self._start = None
+
+        self._pace()
+        frame = cv2.imread(self.paths[self.frame_index])
+        self.frame_index += 1
+        if frame is None:
+            return False, None
+        if out is not None and out.shape == frame.shape:
+            np.copyto(out, frame)
+            return True, out
+        return True, frame
+
+class SyntheticSource(FrameSource):
+    """Generated frames (moving gradient with a frame counter) for headless tests and benchmarks."""
+
+    def __init__(self, width=1280, height=720, speed=1.0, num_frames=None, fps=None):
+        super().__init__(speed)
+        self.num_frames = num_frames  # None = endless
+        if fps:
+            self.fps = fps
+        self.set_resolution(width, height)
+
+    def set_resolution(self, width, height):
+        self.width, self.height = width, height
+        self._gradient = np.tile(np.arange(width, dtype=np.uint16) * 255 // max(1, width - 1), (height, 1))
+        return width, height
+
+    def read(self, out=None):
+        if self.num_frames is not None and self.frame_index >= self.num_frames:
+            return self._finish()
+        self._pace()
+
+        shape = (self.height, self.width, 3)
+        frame = out if out is not None and out.shape == shape else np.empty(shape, dtype=np.uint8)
+        shifted = ((self._gradient + self.frame_index * 4) % 256).astype(np.uint8)
+        frame[:, :, 0] = shifted
+        frame[:, :, 1] = shifted[:, ::-1]
+        frame[:, :, 2] = self.frame_index % 256
+        cv2.putText(frame, str(self.frame_index), (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        self.frame_index += 1
+        return True, frame
+
+def open_source(video_source, speed=1.0, loop=False):
+    """Build a FrameSource from a device index, clip path, image folder, "synthetic", or an existing source."""
+    if isinstance(video_source, FrameSource):
+        return video_source
+    if isinstance(video_source, int):
+        return DeviceSource(video_source)
+    if video_source == "synthetic":
+        return SyntheticSource(speed=speed)
+    if os.path.isdir(video_source):
+        return ImageDirectorySource(video_source, speed=speed, loop=loop)
+    return VideoFileSource(video_source, speed=speed, loop=loop)
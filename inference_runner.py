@@ -0,0 +1,69 @@
+import threading
+import time
+
+class InferenceRunner:
+    """Run a model callback on each *new* camera frame, at most `max_rate` times per second.
+
+    The callback is called as `process(frame, seq)` on a background thread. Frames are
+    deduplicated by their CameraManager sequence number, so a slow camera never causes the
+    same frame to be processed twice, and the thread sleeps instead of spinning while it
+    waits. Returning False from the callback stops the runner.
+    """
+
+    def __init__(self, camera, process, max_rate=10.0, frame_timeout=0.5, size=None, max_side=None):
+        self.camera = camera
+        self.process = process
+        self.max_rate = max_rate  # Upper bound on inferences per second (None or 0 = unbounded); may change while running
+        self.size = size  # Exact (width, height) the model wants, or None
+        self.max_side = max_side  # Cap on the longer side (e.g. 640 for YOLO), or None
+        self.frame_timeout = frame_timeout  # How long to wait for a new frame before re-checking stop
+        self.last_seq = 0  # Sequence number of the last frame handed to `process`
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the inference thread (no-op if it is already running)."""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0, wait=True):
+        """Ask the loop to stop and (unless wait=False) wait for the current inference to finish."""
+        self._stop_event.set()
+        if wait and self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def is_running(self):
+        """Return True while the inference thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """Wait for a newer frame, pace to `max_rate`, and call `process` on it."""
+        next_run = 0.0
+
+        while not self._stop_event.is_set():
+            # ✅ Sleep out the rest of the pacing interval instead of spinning
+            delay = next_run - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+
+            seq, frame = self.camera.read_after(self.last_seq, timeout=self.frame_timeout,
+                                                 size=self.size, max_side=self.max_side)
+            if frame is None:
+                if not self.camera.is_running():
+                    print("⚠️ Camera stopped; inference loop exiting.")
+                    break
+                continue  # No new frame yet; never re-run the model on the old one
+
+            self.last_seq = seq
+            next_run = time.monotonic() + (1.0 / self.max_rate if self.max_rate else 0.0)
+
+            try:
+                if self.process(frame, seq) is False:
+                    break
+            except Exception as e:
+                print(f"⚠️ Inference error: {e}")
+
+        self._stop_event.set()
@@ -1,9 +1,5 @@
-import cv2
 import os
-import numpy as np
-import threading
 import requests
-import mediapipe as mp
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
@@ -13,27 +9,26 @@ from kivy.uix.relativelayout import RelativeLayout
 from kivy.graphics import Color, Rectangle
 from kivy.clock import Clock
 from CameraManager import CameraManager  # Camera Management Class
+from inference_runner import InferenceRunner
+from model_registry import models
+import face_store  # Registers the shared "face_model"
+from face_pipeline import identify_faces
+from face_votes import VoteAccumulator
 
 # Firebase Configuration
 FIREBASE_DATABASE_URL = "https://project-mavii1-default-rtdb.firebaseio.com"
 
-# Initialize MediaPipe Face Detection
-mp_face_detection = mp.solutions.face_detection
-face_detector = mp_face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5)
-
-# EigenFace Recognizer (for Face Recognition)
-recognizer = cv2.face.EigenFaceRecognizer_create()
-
+FACE_SCAN_RATE = 10  # Max face login attempts per second
 
 class LoginPage(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.camera = None
         self.is_scanning = False
+        self.runner = None  # InferenceRunner driving recognize_face
         self.recognizer_trained = False
-        self.recognition_attempts = []
-        self.max_attempts = 5
-        self.confidence_threshold = 5000
+        self.label_map = {}
+        self.votes = VoteAccumulator()  # Decides as soon as one identity clearly leads
 
         # Get the correct path for the background image
         bg_path = os.path.abspath("bgwhite.jpg")  # Ensure the image is in your project folder
@@ -101,9 +96,6 @@ class LoginPage(Screen):
         layout.add_widget(box)
         self.add_widget(layout)
 
-        # Load & Train Faces on App Start
-        self.known_faces, self.label_map = self.load_known_faces("images")
-
     def update_bg(self, *args):
         """Update background image position and size when the window resizes."""
         self.bg_rect.pos = self.pos
@@ -133,70 +125,49 @@ class LoginPage(Screen):
 
     def start_scan(self, instance):
         """Start face recognition login (No Camera Feed)."""
-        if not self.recognizer_trained:
+        # Only known once the model is built; otherwise the first scan finds out off the UI thread
+        if models.is_loaded("face_model") and models.get("face_model")[0] is None:
             self.error_label.text = "No trained faces found!"
             return
 
         self.is_scanning = True
         self.face_login_button.text = "Scanning..."
 
-        if not self.camera:
-            self.camera = CameraManager()
-
-        threading.Thread(target=self.recognize_face, daemon=True).start()
-
-    def recognize_face(self):
-        """Recognize face and log in if matched (No Camera Feed)."""
-        while self.is_scanning:
-            if not self.camera:
-                return
-
-            ret, frame = self.camera.get_frame()
-            if ret:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = face_detector.process(rgb_frame)
-
-                if not results.detections:
-                    continue
-
-                for detection in results.detections:
-                    bboxC = detection.location_data.relative_bounding_box
-                    frame_h, frame_w, _ = frame.shape
-
-                    x = max(0, int(bboxC.xmin * frame_w))
-                    y = max(0, int(bboxC.ymin * frame_h))
-                    w = max(1, int(bboxC.width * frame_w))
-                    h = max(1, int(bboxC.height * frame_h))
-
-                    x = min(x, frame_w - 1)
-                    y = min(y, frame_h - 1)
-                    w = min(w, frame_w - x)
-                    h = min(h, frame_h - y)
+        if not self.camera or not self.camera.is_running():
+            self.camera = CameraManager()  # Fresh one if another page released the shared camera
 
-                    face = rgb_frame[y:y + h, x:x + w]
+        self.votes.reset()
+        self.stop_recognition()
+        self.runner = InferenceRunner(self.camera, self.recognize_face, max_rate=FACE_SCAN_RATE)
+        self.runner.start()
 
-                    if face.shape[0] > 20 and face.shape[1] > 20:
-                        face = self.preprocess_face(face)
+    def stop_recognition(self):
+        """Stop the face login thread and wait for it to finish."""
+        if self.runner:
+            self.runner.stop()
+            self.runner = None
 
-                        if self.recognizer_trained and face is not None:
-                            label, confidence = recognizer.predict(face)
+    def recognize_face(self, frame, seq):
+        """Recognize face in one new frame and log in if matched (No Camera Feed)."""
+        if not self.is_scanning:
+            return False
 
-                            if confidence < self.confidence_threshold:
-                                self.recognition_attempts.append(label)
-
-                                if len(self.recognition_attempts) >= self.max_attempts:
-                                    most_frequent = max(set(self.recognition_attempts), key=self.recognition_attempts.count)
-                                    user_name = self.label_map.get(most_frequent, "Unknown")
-                                    Clock.schedule_once(lambda dt: self.successful_login(user_name))
-                                    return
-                            else:
-                                self.recognition_attempts = []
-
-    def preprocess_face(self, face):
-        """Preprocess face for recognition."""
-        face = cv2.cvtColor(face, cv2.COLOR_RGB2GRAY)
-        face = cv2.resize(face, (200, 200))
-        return face
+        # ✅ First scan waits here (off the UI thread) if warm-up has not built the models yet
+        index, self.label_map = models.get("face_model")
+        self.recognizer_trained = index is not None
+        if not self.recognizer_trained:
+            Clock.schedule_once(lambda dt: self.no_trained_faces())
+            return False
+
+        face_detector = models.get("face_detector")
+        matches = identify_faces(face_detector, index, frame)  # ✅ All faces in one batched query
+        # Nearest enrolled face, accepted against that identity's calibrated threshold
+        decision = self.votes.update([(m.label, m.score, m.accepted) for m in matches], seq)
+        if decision is not None:
+            print(f"✅ Face login decided after {self.votes.frames} frames: {self.votes.trace[-1]}")
+            user_name = self.label_map.get(decision, "Unknown")
+            Clock.schedule_once(lambda dt: self.successful_login(user_name))
+            return False
 
     def successful_login(self, name):
         """Stop scanning and switch to the dashboard once a face is recognized."""
@@ -205,27 +176,17 @@ class LoginPage(Screen):
         self.face_login_button.text = "Use Face Recognition"
         self.manager.current = "dashboard_page"
 
-    def load_known_faces(self, folder_path):
-        """Load known faces for recognition."""
-        known_faces, labels, label_map = [], [], {}
-
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
-
-        for idx, file_name in enumerate(os.listdir(folder_path)):
-            if file_name.endswith(('.jpg', '.jpeg', '.png')):
-                image_path = os.path.join(folder_path, file_name)
-                image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-                image = cv2.resize(image, (200, 200))
-
-                if image is not None:
-                    known_faces.append(image)
-                    labels.append(len(label_map))
-                    label_map[len(label_map)] = os.path.splitext(file_name)[0]
-
-        if known_faces:
-            recognizer.train(known_faces, np.array(labels))
-            recognizer.save("trained_faces.xml")
-            self.recognizer_trained = True
+    def no_trained_faces(self):
+        """Stop scanning when there are no enrolled faces to compare against."""
+        self.is_scanning = False
+        self.face_login_button.text = "Use Face Recognition"
+        self.error_label.text = "No trained faces found!"
 
-        return known_faces, label_map
+    def on_leave(self, *args):
+        """Stop face login when leaving the page."""
+        self.is_scanning = False
+        self.face_login_button.text = "Use Face Recognition"
+        self.stop_recognition()
+        if self.camera:
+            self.camera.release_camera()  # ✅ Stop the capture thread once login is done
+            self.camera = None
@@ -3,28 +3,35 @@ from kivy.uix.screenmanager import ScreenManager, SlideTransition
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.button import Button
 from kivy.uix.image import Image
-from selection_page import SelectionPage
-from login_signup_page import LoginSignUpPage
-from login_page import LoginPage
-from signup_page import SignUpPage
-from dashboard_page import DashboardPage
-from document_reader_page import DocumentReaderPage
-from object_recognition_page import ObjectRecognitionPage
-from text_to_speech_page import TextRecognitionPage
-from accountsettings import AccessibilitySettingsPage
+from kivy.clock import Clock
+from model_registry import models
+from startup_timing import StartupTimer
+
+startup = StartupTimer()
+
+# (module, class, screen name) — pages only register their models on import; nothing heavy is built here
+PAGES = [
+    ("selection_page", "SelectionPage", "selection_page"),
+    ("login_signup_page", "LoginSignUpPage", "login_signup_page"),
+    ("login_page", "LoginPage", "login_page"),  # ✅ This is the correct name
+    ("signup_page", "SignUpPage", "signup_page"),
+    ("dashboard_page", "DashboardPage", "dashboard_page"),
+    ("document_reader_page", "DocumentReaderPage", "document_reader_page"),
+    ("object_recognition_page", "ObjectRecognitionPage", "object_recognition_page"),
+    ("text_to_speech_page", "TextRecognitionPage", "text_to_speech_page"),
+    ("accountsettings", "AccessibilitySettingsPage", "accountsettings"),
+]
+
+# Built in the background once the first screen is up, in the order the user is likely to need them
+WARM_UP_MODELS = ["face_detector", "face_model", "yolo", "ocr_reader"]
+
 class MyApp(App):
     def build(self):
         self.sm = ScreenManager(transition=SlideTransition())
 
-        self.sm.add_widget(SelectionPage(name="selection_page"))
-        self.sm.add_widget(LoginSignUpPage(name="login_signup_page"))
-        self.sm.add_widget(LoginPage(name="login_page"))  # ✅ This is the correct name
-        self.sm.add_widget(SignUpPage(name="signup_page"))
-        self.sm.add_widget(DashboardPage(name="dashboard_page"))
-        self.sm.add_widget(DocumentReaderPage(name="document_reader_page"))
-        self.sm.add_widget(ObjectRecognitionPage(name="object_recognition_page"))
-        self.sm.add_widget(TextRecognitionPage(name="text_to_speech_page"))
-        self.sm.add_widget(AccessibilitySettingsPage(name="accountsettings"))
+        for module_name, class_name, screen_name in PAGES:
+            page_class = startup.import_page(module_name, class_name)
+            self.sm.add_widget(startup.build_page(page_class, screen_name))
         # Adding a FloatLayout to overlay the button on top
         float_layout = FloatLayout()
 
@@ -47,6 +54,22 @@ class MyApp(App):
 
         return root_layout
 
+    def on_start(self):
+        """Report start-up time once the first screen is drawn, then warm up the models."""
+        Clock.schedule_once(self.after_first_frame, 0)
+
+    def after_first_frame(self, dt):
+        startup.report()
+        warm_up = models.warm_up(WARM_UP_MODELS)
+        Clock.schedule_interval(lambda dt: self.report_models(warm_up), 1)
+
+    def report_models(self, warm_up):
+        """Print model build times once background warm-up has finished."""
+        if warm_up.is_alive():
+            return True
+        startup.report(models.build_times)
+        return False
+
     def go_back(self, instance):
         """Goes back to the previous screen if possible."""
         if self.sm.current == "selection_page":
@@ -0,0 +1,64 @@
+import threading
+import time
+
+class ModelRegistry:
+    """Builds each heavy model on first use (or in a background warm-up) and remembers how long it took.
+
+    Pages register a factory by name at import time, which is cheap; the factory itself
+    imports the heavy library and constructs the model only when `get()` is first called.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._models = {}
+        self._locks = {}
+        self.build_times = {}  # Model name -> seconds spent in its factory
+
+    def register(self, name, factory):
+        """Register a zero-argument factory for `name` (replaces any earlier one)."""
+        self._factories[name] = factory
+        self._locks.setdefault(name, threading.Lock())
+        self._models.pop(name, None)
+
+    def get(self, name):
+        """Return the model, building it on this thread if nobody has yet."""
+        if name in self._models:
+            return self._models[name]
+
+        with self._locks[name]:  # Concurrent callers wait for the first build instead of duplicating it
+            if name not in self._models:
+                start = time.perf_counter()
+                self._models[name] = self._factories[name]()
+                self.build_times[name] = time.perf_counter() - start
+                print(f"🧠 Loaded {name} in {self.build_times[name]:.2f}s")
+        return self._models[name]
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def reload(self, name):
+        """Drop a built model so the next `get()` rebuilds it (e.g. after new faces are enrolled)."""
+        with self._locks.setdefault(name, threading.Lock()):
+            self._models.pop(name, None)
+
+    def warm_up(self, names):
+        """Build the given models one after another on a background thread."""
+        def build_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"⚠️ Warm-up of {name} failed: {e}")
+
+        thread = threading.Thread(target=build_all, daemon=True)
+        thread.start()
+        return thread
+
+models = ModelRegistry()  # Shared by every page
+
+def _build_face_detector():
+    import mediapipe as mp
+    return mp.solutions.face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5)
+
+# ✅ MediaPipe Face Detection is shared by face login and face scanning
+models.register("face_detector", _build_face_detector)
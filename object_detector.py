@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import cv2
+import numpy as np
+from detection_governor import INPUT_SIZES
+
+MODEL_PATH = "yolov8n.pt"  # Change this to your trained model if needed
+EXPORT_DIR = "model_cache"  # Exported ONNX / OpenVINO models, reused across launches
+INPUT_SIZE = 640  # Exported models take a fixed square input
+CONF_THRESHOLD = 0.25
+NMS_THRESHOLD = 0.45
+BACKENDS = ("torch", "onnx", "openvino")
+
+# "auto" picks the fastest installed runtime; set MAVI_DETECTOR to torch / onnx / openvino (":int8" for INT8)
+DETECTOR_BACKEND = os.environ.get("MAVI_DETECTOR", "auto")
+
+class TorchDetector:
+    """YOLOv8 through Ultralytics / PyTorch eager (the reference implementation)."""
+    backend = "torch"
+    sizes = INPUT_SIZES  # Any input size works
+
+    def __init__(self, model_path=MODEL_PATH):
+        from ultralytics import YOLO  # Deferred: importing ultralytics pulls in torch
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+
+    def detect(self, frame, imgsz=INPUT_SIZE):
+        """Detections for one BGR frame as an (N, 6) array: x1, y1, x2, y2, confidence, class."""
+        results = self.model(frame, imgsz=imgsz, conf=CONF_THRESHOLD, iou=NMS_THRESHOLD, verbose=False)
+        return results[0].boxes.data.cpu().numpy()
+
+class ExportedDetector:
+    """YOLOv8 exported once to ONNX or OpenVINO IR and run without PyTorch.
+
+    Pre- and post-processing (letterbox, decoding, class-aware NMS) are done here with NumPy and
+    OpenCV, so after the first export the app never imports torch for object detection. Exported
+    models have a fixed input size, so every size in `sizes` is exported (and cached) up front, while
+    the model is built; `self.sizes` lists the ones that succeeded and `detect()` never exports.
+    """
+
+    def __init__(self, backend="onnx", model_path=MODEL_PATH, int8=False, sizes=INPUT_SIZES):
+        self.backend = backend + (":int8" if int8 else "")
+        self._kind, self._model_path, self._int8 = backend, model_path, int8
+        self._sessions = {}  # imgsz -> (run, reusable input buffer)
+        for imgsz in sizes:
+            try:
+                self._load(imgsz)
+            except Exception as e:
+                print(f"⚠️ {self.backend} detector at {imgsz}px unavailable: {e}")
+        if not self._sessions:
+            raise RuntimeError(f"No {self.backend} model could be exported or loaded")
+        self.sizes = tuple(sorted(self._sessions))
+
+    def _load(self, imgsz):
+        path, self.names = export_model(self._model_path, self._kind, self._int8, imgsz)
+
+        if self._kind == "onnx":
+            import onnxruntime as ort
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+            input_name = session.get_inputs()[0].name
+            run = lambda x: session.run(None, {input_name: x})[0]
+        else:
+            import openvino as ov
+            compiled = ov.Core().compile_model(path, "CPU", {"PERFORMANCE_HINT": "LATENCY"})
+            request = compiled.create_infer_request()
+            run = lambda x: request.infer({0: x})[compiled.output(0)]
+
+        self._sessions[imgsz] = run, np.empty((1, 3, imgsz, imgsz), dtype=np.float32)
+
+    def detect(self, frame, imgsz=INPUT_SIZE):
+        """Detections for one BGR frame as an (N, 6) array: x1, y1, x2, y2, confidence, class.
+
+        An `imgsz` that was not exported uses the nearest loaded size instead.
+        """
+        imgsz = min(self.sizes, key=lambda size: abs(size - imgsz))
+        run, buffer = self._sessions[imgsz]
+        scale, pad_x, pad_y = self._letterbox(frame, buffer)
+        output = run(buffer)[0].T  # (anchors, 4 + classes)
+
+        class_scores = output[:, 4:]
+        classes = class_scores.argmax(axis=1)
+        confidences = class_scores[np.arange(len(classes)), classes]
+        keep = confidences >= CONF_THRESHOLD
+        if not keep.any():
+            return np.empty((0, 6), dtype=np.float32)
+        cx, cy, w, h = output[keep, :4].T
+        confidences, classes = confidences[keep], classes[keep]
+
+        boxes = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+        offset = classes[:, None] * (imgsz * 2)  # Shift each class apart so one NMS call is class-aware
+        shifted = boxes.copy()
+        shifted[:, :2] += offset
+        kept = np.asarray(cv2.dnn.NMSBoxes(shifted.tolist(), confidences.tolist(),
+                                           CONF_THRESHOLD, NMS_THRESHOLD), dtype=np.int64).reshape(-1)
+
+        boxes = boxes[kept]
+        x1 = (boxes[:, 0] - pad_x) / scale
+        y1 = (boxes[:, 1] - pad_y) / scale
+        frame_h, frame_w = frame.shape[:2]
+        return np.stack([np.clip(x1, 0, frame_w), np.clip(y1, 0, frame_h),
+                         np.clip(x1 + boxes[:, 2] / scale, 0, frame_w), np.clip(y1 + boxes[:, 3] / scale, 0, frame_h),
+                         confidences[kept], classes[kept].astype(np.float32)], axis=1)
+
+    @staticmethod
+    def _letterbox(frame, buffer):
+        """Resize keeping the aspect ratio, pad to the input size, and write CHW RGB floats into `buffer`."""
+        imgsz = buffer.shape[2]
+        frame_h, frame_w = frame.shape[:2]
+        scale = min(imgsz / frame_w, imgsz / frame_h)
+        new_w, new_h = round(frame_w * scale), round(frame_h * scale)
+        pad_x, pad_y = (imgsz - new_w) // 2, (imgsz - new_h) // 2
+
+        canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+        canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(frame, (new_w, new_h),
+                                                                      interpolation=cv2.INTER_LINEAR)
+        np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), 1 / 255.0, out=buffer[0], casting="unsafe")
+        return scale, pad_x, pad_y
+
+def export_model(model_path=MODEL_PATH, backend="onnx", int8=False, imgsz=INPUT_SIZE):
+    """Return (exported model path, class names), exporting only if no cached copy matches.
+
+    The cache key covers the weights' content, the backend, INT8 and the input size, so retrained
+    weights are exported again. ONNX INT8 uses ONNX Runtime dynamic quantization; OpenVINO INT8 uses
+    the Ultralytics NNCF export, which calibrates on a small sample dataset.
+    """
+    with open(model_path, "rb") as f:
+        weights_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    name = f"{stem}-{weights_hash}-{imgsz}{'-int8' if int8 else ''}"
+    target = os.path.join(EXPORT_DIR, name + (".onnx" if backend == "onnx" else "_openvino"))
+    names_path = os.path.join(EXPORT_DIR, name + ".names.json")
+
+    if os.path.exists(target) and os.path.exists(names_path):
+        with open(names_path) as f:
+            names = {int(k): v for k, v in json.load(f).items()}
+        return _model_file(target, backend), names
+
+    print(f"🔄 Exporting {model_path} to {backend}{' (INT8)' if int8 else ''}; cached in {EXPORT_DIR}/")
+    from ultralytics import YOLO
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    model = YOLO(model_path)
+    names = dict(model.names)
+
+    if backend == "onnx":
+        exported = model.export(format="onnx", imgsz=imgsz, dynamic=False, simplify=True)
+        if int8:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(exported, target, weight_type=QuantType.QUInt8)
+            os.remove(exported)  # fp32 intermediate that Ultralytics wrote next to the weights
+        else:
+            os.replace(exported, target)
+    else:
+        exported = model.export(format="openvino", imgsz=imgsz, int8=int8, half=False)
+        if os.path.exists(target):
+            import shutil
+            shutil.rmtree(target)
+        os.replace(exported, target)
+
+    with open(names_path, "w") as f:
+        json.dump({str(k): v for k, v in names.items()}, f)
+    return _model_file(target, backend), names
+
+def _model_file(target, backend):
+    if backend == "onnx":
+        return target
+    return os.path.join(target, next(f for f in os.listdir(target) if f.endswith(".xml")))
+
+def parse_backend(spec):
+    """'onnx:int8' -> ('onnx', True)."""
+    backend, _, option = spec.partition(":")
+    if backend not in BACKENDS and backend != "auto":
+        raise ValueError(f"Unknown detector backend {spec!r}; expected auto or one of {BACKENDS}")
+    return backend, option == "int8"
+
+def _installed(module):
+    import importlib.util
+    return importlib.util.find_spec(module) is not None
+
+def create_detector(spec=None, model_path=MODEL_PATH):
+    """Build the detector named by `spec` (default DETECTOR_BACKEND), falling back to PyTorch on failure."""
+    backend, int8 = parse_backend(spec or DETECTOR_BACKEND)
+    if backend == "auto":
+        backend = "openvino" if _installed("openvino") else "onnx" if _installed("onnxruntime") else "torch"
+
+    if backend != "torch":
+        try:
+            return ExportedDetector(backend, model_path, int8=int8)
+        except Exception as e:
+            print(f"⚠️ {backend} detector unavailable ({e}); falling back to PyTorch")
+    return TorchDetector(model_path)
+
@@ -1,25 +1,33 @@
-import cv2
-import numpy as np
-import threading
+import time
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.image import Image
 from kivy.uix.label import Label
 from kivy.clock import Clock
-from kivy.graphics.texture import Texture
-from ultralytics import YOLO
 from CameraManager import CameraManager  # Import CameraManager
-
-# ✅ Load YOLOv8 Model (Trained on COCO Dataset or Custom Dataset)
-MODEL_PATH = "yolov8n.pt"  # Change this to your trained model if needed
-model = YOLO(MODEL_PATH)  
+from preview_widget import CameraPreview
+from inference_runner import InferenceRunner
+from model_registry import models
+from object_detector import create_detector
+from detection_governor import DetectionGovernor
+from result_bus import Detection, DetectionResult, ResultBus
+from speech import LOW, announcer
+
+# ✅ YOLOv8 (COCO or custom, see object_detector.MODEL_PATH) on the backend chosen by MAVI_DETECTOR, loaded on first use
+models.register("yolo", create_detector)
+DETECTION_RATE = 10  # Max YOLOv8 inferences per second; the governor lowers it on slow devices
+OBJECT_REPEAT_INTERVAL = 8.0  # Seconds before the same object class is announced again
+DETECTION_SIZE = 640  # Largest YOLOv8 input size; frames are only downscaled if the camera delivers more
 
 class ObjectRecognitionPage(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.camera = None  # Camera will be initialized when scanning starts
         self.is_scanning = False  # Flag to track scanning status
+        self.runner = None  # InferenceRunner driving detect_objects
+        self.governor = DetectionGovernor(max_rate=DETECTION_RATE)  # Input size / rate vs. latency budget
+        self.results = ResultBus(self.show_detections)  # Detector thread -> UI thread, once per frame at most
 
         # ✅ UI Layout
         layout = BoxLayout(orientation='vertical', spacing=10, padding=20)
@@ -29,7 +37,7 @@ class ObjectRecognitionPage(Screen):
         layout.add_widget(self.label)
 
         # ✅ Video feed widget
-        self.image_widget = Image()
+        self.image_widget = CameraPreview()
         layout.add_widget(self.image_widget)
 
         # ✅ Scan Objects Button
@@ -41,59 +49,78 @@ class ObjectRecognitionPage(Screen):
 
     def start_scan(self, instance):
         """Start object recognition using YOLOv8."""
-        if not self.camera:
-            self.camera = CameraManager()  # Initialize camera if not already open
+        if not self.camera or not self.camera.is_running():
+            self.camera = CameraManager()  # Initialize camera if not already open (or released by another page)
 
         self.label.text = "Scanning for objects..."
         self.is_scanning = True
 
         Clock.schedule_interval(self.update_video_feed, 1.0 / 30.0)  # Update every frame
-        threading.Thread(target=self.detect_objects, daemon=True).start()  # Run YOLOv8 in a separate thread
-
-    def detect_objects(self):
-        """Perform YOLOv8 object recognition in real-time."""
-        while self.is_scanning:
-            if not self.camera:
-                return
-
-            ret, frame = self.camera.get_frame()
-            if ret:
-                results = model(frame)  # Run YOLOv8 detection
-                detections = results[0].boxes.data.cpu().numpy()  # Get detected objects
-
-                # Draw bounding boxes on the frame
-                for detection in detections:
-                    x1, y1, x2, y2, conf, cls = map(int, detection[:6])  # Get box coords & class
-                    label = f"{model.names[cls]}: {conf:.2f}"  # Get object name
-
-                    # ✅ Draw Bounding Box
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-
-                # ✅ Update label with detected objects
-                detected_objects = [model.names[int(d[5])] for d in detections]
-                if detected_objects:
-                    self.label.text = f"Detected: {', '.join(set(detected_objects))}"
-                else:
-                    self.label.text = "No objects detected"
+        self.stop_detection()
+        self.governor.reset()
+        self.runner = InferenceRunner(self.camera, self.detect_objects, max_rate=DETECTION_RATE,
+                                      max_side=DETECTION_SIZE)
+        self.runner.start()  # Run YOLOv8 in a separate thread, once per new frame
+
+    def stop_detection(self):
+        """Stop the YOLOv8 thread and wait for the current inference to finish."""
+        if self.runner:
+            self.runner.stop()
+            self.runner = None
+        self.results.clear()
+        self.image_widget.show_detections(None)
+
+    def detect_objects(self, frame, seq):
+        """Perform YOLOv8 object recognition on one new camera frame."""
+        if not self.is_scanning:
+            return False
+
+        if not self.governor.should_run(frame):
+            return  # ✅ Scene unchanged: the previous detections still hold
+
+        detector = models.get("yolo")  # Built on the first scan unless warm-up already did it
+        self.governor.use_sizes(detector.sizes)  # Only sizes the backend has (exported models are fixed-size)
+        start = time.perf_counter()
+        detections = detector.detect(frame, imgsz=self.governor.size)  # x1, y1, x2, y2, conf, class
+        self.governor.record(time.perf_counter() - start)
+        if self.runner:
+            self.runner.max_rate = self.governor.rate  # Slower devices get fewer, not later, detections
+
+        # ✅ Publish plain data; widgets are only touched on the UI thread
+        height, width = frame.shape[:2]
+        result = DetectionResult(seq, (width, height), [
+            Detection(detector.names[int(d[5])], float(d[4]), tuple(float(v) for v in d[:4]))
+            for d in detections])
+        self.results.publish(result)
+
+        for name in {detection.label for detection in result.detections}:
+            announcer.say(f"Detected: {name}", priority=LOW, key=f"object:{name}", min_interval=OBJECT_REPEAT_INTERVAL)
+
+    def show_detections(self, result):
+        """UI thread: update the caption and the preview overlay from the newest DetectionResult."""
+        if not self.is_scanning:
+            return
+        names = sorted({detection.label for detection in result.detections})
+        text = f"Detected: {', '.join(names)}" if names else "No objects detected"
+        if self.label.text != text:
+            self.label.text = text
+        self.image_widget.show_detections(result)
 
     def update_video_feed(self, dt):
         """Continuously update the video feed while scanning."""
         if not self.is_scanning or not self.camera:
             return
 
-        ret, frame = self.camera.get_frame()
-        if ret:
-            # Convert frame to texture for Kivy UI
-            buffer = cv2.flip(frame, 0).tobytes()
-            texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt="bgr")
-            texture.blit_buffer(buffer, colorfmt="bgr", bufferfmt="ubyte")
-            self.image_widget.texture = texture
-        else:
+        if not self.camera.is_running():
             print("⚠️ Failed to read frame from camera. Restarting...")
+            self.is_scanning = False
+            Clock.unschedule(self.update_video_feed)
+            self.stop_detection()
             self.release_camera()
-            self.camera = CameraManager()  # Reinitialize camera
             Clock.schedule_once(lambda dt: self.start_scan(None), 1)
+            return
+
+        self.image_widget.show_latest(self.camera)  # Reuses one texture; skips frames already shown
 
     def release_camera(self):
         """Ensure the camera is released properly."""
@@ -105,4 +132,5 @@ class ObjectRecognitionPage(Screen):
         """Ensure the camera is released when leaving the page."""
         self.is_scanning = False
         Clock.unschedule(self.update_video_feed)
+        self.stop_detection()
         self.release_camera()
@@ -0,0 +1,207 @@
+import importlib.util
+import json
+import os
+import platform
+import time
+import cv2
+import numpy as np
+from ocr_pipeline import reading_lines
+
+OCR_LANGS = ["en"]
+ENGINES = ("easyocr", "paddle", "tesseract")
+ENGINE_CHOICE_PATH = "ocr_engine.json"  # Result of the automatic speed test, reused across launches
+
+# "auto" measures the installed engines once and keeps the fastest accurate one; or force easyocr / paddle / tesseract
+OCR_ENGINE = os.environ.get("MAVI_OCR", "auto")
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+class EasyOCREngine:
+    """EasyOCR (CRAFT detector + CRNN recognizer), with the two stages exposed separately."""
+    name = "easyocr"
+    thread_safe = True  # PyTorch inference keeps no per-call state on the reader
+
+    def __init__(self, langs=OCR_LANGS):
+        import easyocr  # Deferred: importing easyocr pulls in torch
+        self.reader = easyocr.Reader(langs)
+        self._quads = {}  # Bounding box -> quad of each tilted line from the last detect()
+
+    def readtext(self, image):
+        """[(box points, text, confidence)] for one image."""
+        return [(box, text, float(confidence)) for box, text, confidence in self.reader.readtext(image)]
+
+    def detect(self, gray):
+        """Text boxes as [x_min, x_max, y_min, y_max], clipped to the image (CRAFT pads its boxes).
+
+        Tilted lines (EasyOCR's free list) are returned as their bounding rectangles; the quad is
+        remembered so `recognize` can still straighten the line before reading it.
+        """
+        horizontal, free = self.reader.detect(gray)
+        height, width = gray.shape[:2]
+        clip = lambda b: [max(0, int(b[0])), min(width, int(b[1])), max(0, int(b[2])), min(height, int(b[3]))]
+        boxes = [clip(b) for b in horizontal[0]]
+        self._quads = {}
+        for quad in free[0]:
+            points = np.asarray(quad, dtype=np.float32)
+            box = clip([points[:, 0].min(), np.ceil(points[:, 0].max()), points[:, 1].min(), np.ceil(points[:, 1].max())])
+            self._quads[tuple(box)] = [[int(x), int(y)] for x, y in points]
+            boxes.append(box)
+        return [b for b in boxes if b[1] > b[0] and b[3] > b[2]]
+
+    def recognize(self, gray, boxes):
+        """[(text, confidence)] for each box, in the same order, in one batched call."""
+        quads = self._quads
+        horizontal = [box for box in boxes if tuple(box) not in quads]
+        free = [quads[tuple(box)] for box in boxes if tuple(box) in quads]
+        recognized = self.reader.recognize(gray, horizontal_list=horizontal, free_list=free)
+        by_corner = {(int(r[0][0][0]), int(r[0][0][1])): r for r in recognized}
+        corners = [tuple(quads[tuple(box)][0]) if tuple(box) in quads else (int(box[0]), int(box[2]))
+                   for box in boxes]
+        found = [by_corner.get(corner) for corner in corners]
+        return [(r[1], float(r[2])) if r else ("", 0.0) for r in found]
+
+class PaddleOCREngine:
+    """PaddleOCR (DB detector + SVTR/CRNN recognizer): usually the fastest accurate engine on CPU."""
+    name = "paddle"
+    thread_safe = False  # Paddle inference predictors must not be called from two threads at once
+
+    def __init__(self, langs=OCR_LANGS):
+        from paddleocr import PaddleOCR
+        self.ocr = PaddleOCR(lang="en" if langs == ["en"] else langs[0], use_angle_cls=False, show_log=False)
+
+    def readtext(self, image):
+        lines = self.ocr.ocr(image, cls=False)[0] or []
+        return [(points, text, float(confidence)) for points, (text, confidence) in lines]
+
+    def detect(self, gray):
+        polygons = self.ocr.ocr(gray, rec=False, cls=False)[0] or []
+        height, width = gray.shape[:2]
+        boxes = []
+        for polygon in polygons:
+            points = np.asarray(polygon)
+            box = [max(0, int(points[:, 0].min())), min(width, int(np.ceil(points[:, 0].max()))),
+                   max(0, int(points[:, 1].min())), min(height, int(np.ceil(points[:, 1].max())))]
+            if box[1] > box[0] and box[3] > box[2]:
+                boxes.append(box)
+        return boxes
+
+    def recognize(self, gray, boxes):
+        crops = [cv2.cvtColor(gray[y_min:y_max, x_min:x_max], cv2.COLOR_GRAY2BGR)  # Recognizer wants 3 channels
+                 for x_min, x_max, y_min, y_max in boxes]
+        recognized = self.ocr.ocr(crops, det=False, cls=False)[0] or []
+        return [(text, float(confidence)) for text, confidence in recognized]
+
+class TesseractEngine:
+    """Tesseract through pytesseract: light on memory, no GPU-style model; lines from image_to_data."""
+    name = "tesseract"
+    thread_safe = True  # Every call runs its own tesseract process
+    detect = recognize = None  # One combined pass only, so no per-box recognition cache
+
+    def __init__(self, langs=OCR_LANGS):
+        import pytesseract
+        self.pytesseract = pytesseract
+        self.lang = "+".join({"en": "eng"}.get(lang, lang) for lang in langs)
+        self.pytesseract.get_tesseract_version()  # Fails early if the binary is missing
+
+    def readtext(self, image):
+        data = self.pytesseract.image_to_data(image, lang=self.lang, output_type=self.pytesseract.Output.DICT)
+        lines = {}
+        for i, word in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            if not word.strip() or confidence < 0:
+                continue
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            x, y, w, h = data["left"][i], data["top"][i], data["width"][i], data["height"][i]
+            line = lines.setdefault(key, {"words": [], "conf": [], "box": [x, y, x + w, y + h]})
+            line["words"].append(word)
+            line["conf"].append(confidence / 100.0)
+            box = line["box"]
+            line["box"] = [min(box[0], x), min(box[1], y), max(box[2], x + w), max(box[3], y + h)]
+
+        results = []
+        for line in lines.values():
+            x0, y0, x1, y1 = line["box"]
+            results.append(([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], " ".join(line["words"]),
+                            float(np.mean(line["conf"]))))
+        return results
+
+ENGINE_CLASSES = {"easyocr": EasyOCREngine, "paddle": PaddleOCREngine, "tesseract": TesseractEngine}
+ENGINE_MODULES = {"easyocr": "easyocr", "paddle": "paddleocr", "tesseract": "pytesseract"}
+
+def installed_engines():
+    return [name for name in ENGINES if _installed(ENGINE_MODULES[name])]
+
+def character_error_rate(reference, hypothesis):
+    """Levenshtein distance between the strings divided by the reference length."""
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_char != hyp_char)))
+        previous = current
+    return previous[-1] / len(reference)
+
+CALIBRATION_TEXT = ["The quick brown fox jumps", "over the lazy dog 0123456789"]
+
+def calibration_image():
+    """A small synthetic page with known text, for timing and sanity-checking engines."""
+    image = np.full((160, 900), 255, dtype=np.uint8)
+    for i, line in enumerate(CALIBRATION_TEXT):
+        cv2.putText(image, line, (20, 60 + 60 * i), cv2.FONT_HERSHEY_SIMPLEX, 1.4, 0, 3, cv2.LINE_AA)
+    return image
+
+def measure_engine(engine, image, reference, repeats=2):
+    """(seconds per readtext, CER against `reference`) for an engine on one image."""
+    engine.readtext(image)  # Warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        results = engine.readtext(image)
+    seconds = (time.perf_counter() - start) / repeats
+    text = " ".join(line for _, line in reading_lines(results, min_confidence=0.0))
+    return seconds, character_error_rate(reference.lower(), text.lower())
+
+def auto_select(max_cer=0.2):
+    """Name of the fastest installed engine that reads the calibration page correctly (cached on disk)."""
+    device = f"{platform.system()}-{platform.machine()}-{os.cpu_count()}"
+    try:
+        with open(ENGINE_CHOICE_PATH) as f:
+            choice = json.load(f)
+        if choice.get("device") == device and choice.get("engine") in installed_engines():
+            return choice["engine"]
+    except (OSError, ValueError):
+        pass
+
+    image, reference = calibration_image(), " ".join(CALIBRATION_TEXT)
+    timings = {}
+    for name in installed_engines():
+        try:
+            engine = ENGINE_CLASSES[name]()
+            seconds, cer = measure_engine(engine, image, reference)
+        except Exception as e:
+            print(f"⚠️ OCR engine {name} unavailable: {e}")
+            continue
+        finally:
+            engine = None  # Only the chosen engine stays in memory
+        timings[name] = {"seconds": round(seconds, 4), "cer": round(cer, 4)}
+        print(f"🔎 OCR engine {name}: {seconds * 1000:.0f} ms, CER {cer:.2f}")
+
+    accurate = [name for name, t in timings.items() if t["cer"] <= max_cer] or list(timings)
+    if not accurate:
+        raise RuntimeError("No OCR engine is installed")
+    best = min(accurate, key=lambda name: timings[name]["seconds"])
+    with open(ENGINE_CHOICE_PATH, "w") as f:
+        json.dump({"device": device, "engine": best, "timings": timings}, f, indent=1)
+    return best
+
+def create_ocr_engine(spec=None):
+    """Build the engine named by `spec` (default OCR_ENGINE); "auto" picks by measured speed."""
+    name = spec or OCR_ENGINE
+    if name == "auto":
+        name = auto_select()
+    if name not in ENGINE_CLASSES:
+        raise ValueError(f"Unknown OCR engine {name!r}; expected auto or one of {ENGINES}")
+    print(f"🔎 Using OCR engine: {name}")
+    return ENGINE_CLASSES[name]()
@@ -0,0 +1,306 @@
+import difflib
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+
+MIN_CONFIDENCE = 0.4  # Recognized strings below this are ignored (the vote across frames filters the rest)
+SHARPNESS_THRESHOLD = 80.0  # Variance of the Laplacian below which a frame is too blurry to read
+NEW_VIEW_THRESHOLD = 18.0  # Mean thumbnail difference (0-255) that means the camera points at something new
+GATE_SIZE = 320  # Width the focus and change measures are computed at
+THUMB_SIZE = (32, 24)
+STABLE_VOTES = 2  # Frames a line must be read in before it enters the transcript
+STABLE_ROUNDS = 2  # Consecutive OCR passes with an unchanged transcript before the view counts as read
+LINE_MATCH = 0.75  # difflib ratio above which two readings are taken as the same line
+OCR_CACHE_SIZE = 512  # Recognized text boxes remembered by TwoStageOCR
+HASH_BYTES = 32  # 256-bit crop hashes
+HASH_TOLERANCE = 12  # Differing hash bits still treated as the same crop
+DETECT_REUSE_THRESHOLD = 3.0  # Mean thumbnail difference below which the last text boxes are reused
+BAND_HEIGHT = 512  # Document mode: height of the full-width bands a page is cut into
+BAND_OVERLAP = 160  # Rows shared by neighbouring bands, more than one line of small print
+BAND_WORKERS = 2  # Bands read concurrently (the recognizer is already multi-threaded inside)
+SEAM_CONTAINMENT = 0.6  # Fraction of a box inside a bigger one for it to count as a seam duplicate
+
+def sharpness(gray):
+    """Focus measure: variance of the Laplacian on a downscaled grayscale frame."""
+    height, width = gray.shape[:2]
+    if width > GATE_SIZE:
+        gray = cv2.resize(gray, (GATE_SIZE, max(1, height * GATE_SIZE // width)), interpolation=cv2.INTER_AREA)
+    return cv2.Laplacian(gray, cv2.CV_32F).var()
+
+class SceneGate:
+    """Decides whether an OCR pass is worth its (seconds-long) cost.
+
+    A frame is read only if it is in focus and either shows a new view or the transcript of
+    the current view has not settled yet; once it has, the same page is not read again.
+    """
+
+    def __init__(self, sharpness_threshold=SHARPNESS_THRESHOLD, new_view_threshold=NEW_VIEW_THRESHOLD):
+        self.sharpness_threshold = sharpness_threshold
+        self.new_view_threshold = new_view_threshold
+        self._thumb = None
+        self.blurry = 0  # Frames rejected as out of focus
+        self.unchanged = 0  # Frames rejected because the view was already read
+
+    def reset(self):
+        self._thumb = None
+
+    def check(self, gray, settled):
+        """Return "blurry", "skip", "new_view" or "same_view" for a grayscale frame."""
+        if sharpness(gray) < self.sharpness_threshold:
+            self.blurry += 1
+            return "blurry"
+
+        thumb = cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+        if self._thumb is None or np.abs(thumb - self._thumb).mean() >= self.new_view_threshold:
+            self._thumb = thumb
+            return "new_view"
+        if settled:
+            self.unchanged += 1
+            return "skip"
+        return "same_view"
+
+def reading_lines(results, min_confidence=MIN_CONFIDENCE):
+    """Turn EasyOCR-style [(box, text, confidence)] into [(y, text)] lines in reading order.
+
+    Boxes whose vertical centres are within half a median text height are one line, read left to right.
+    """
+    words = []
+    for box, text, confidence in results:
+        if confidence < min_confidence or not text.strip():
+            continue
+        points = np.asarray(box, dtype=np.float32)
+        words.append((points[:, 1].mean(), points[:, 0].min(), np.ptp(points[:, 1]), text.strip()))
+    if not words:
+        return []
+
+    tolerance = max(1.0, float(np.median([w[2] for w in words])) / 2)
+    words.sort()
+    lines, current = [], [words[0]]
+    for word in words[1:]:
+        if word[0] - np.mean([w[0] for w in current]) <= tolerance:
+            current.append(word)
+        else:
+            lines.append(current)
+            current = [word]
+    lines.append(current)
+    return [(float(np.mean([w[0] for w in line])), " ".join(w[3] for w in sorted(line, key=lambda w: w[1])))
+            for line in lines]
+
+class _Line:
+    __slots__ = ("y", "variants", "votes")
+
+    def __init__(self, y, text):
+        self.y = y
+        self.variants = {text: 1}  # Reading -> frames it was seen in
+        self.votes = 1
+
+    @property
+    def text(self):
+        return max(self.variants, key=self.variants.get)
+
+class TranscriptStabilizer:
+    """Merges OCR passes of one view into a transcript that stops flickering.
+
+    Each pass's lines are matched to known lines by text similarity; a line joins the
+    transcript once it has been read in STABLE_VOTES passes, and its most frequent reading
+    wins. The view counts as settled after STABLE_ROUNDS passes that changed nothing.
+    """
+
+    def __init__(self, stable_votes=STABLE_VOTES, stable_rounds=STABLE_ROUNDS):
+        self.stable_votes = stable_votes
+        self.stable_rounds = stable_rounds
+        self.reset()
+
+    def reset(self):
+        self.lines = []
+        self.transcript = ""
+        self.unchanged_rounds = 0
+
+    @property
+    def settled(self):
+        return self.unchanged_rounds >= self.stable_rounds  # An empty view settles too, so it is not re-read
+
+    def update(self, lines):
+        """Add one pass of [(y, text)] lines; returns True if the transcript changed."""
+        for y, text in lines:
+            best, best_ratio = None, LINE_MATCH
+            for known in self.lines:
+                ratio = difflib.SequenceMatcher(None, known.text, text).ratio()
+                if ratio >= best_ratio:
+                    best, best_ratio = known, ratio
+            if best is None:
+                self.lines.append(_Line(y, text))
+            else:
+                best.variants[text] = best.variants.get(text, 0) + 1
+                best.votes += 1
+                best.y = 0.7 * best.y + 0.3 * y
+
+        stable = sorted((line for line in self.lines if line.votes >= self.stable_votes), key=lambda line: line.y)
+        transcript = "\n".join(line.text for line in stable)
+        if transcript == self.transcript:
+            self.unchanged_rounds += 1
+            return False
+        self.transcript = transcript
+        self.unchanged_rounds = 0
+        return True
+
+class TwoStageOCR:
+    """An OCR engine split into text detection and recognition, with recognition cached per text box.
+
+    Each detected box is cropped and reduced to a 256-bit average hash; a box whose hash is
+    within HASH_TOLERANCE bits of a cached one reuses that recognition. Only new or changed
+    boxes are recognized (in one batch), and while the frame is nearly identical to the last
+    detected one the boxes themselves are reused, so a page held steady costs almost nothing.
+    Engines without separate stages (Tesseract) are passed straight through to `readtext`.
+    """
+
+    def __init__(self, engine, cache_size=OCR_CACHE_SIZE, hash_tolerance=HASH_TOLERANCE):
+        self.engine = engine
+        self.cache_size = cache_size
+        self.hash_tolerance = hash_tolerance
+        self._hashes = np.empty((0, HASH_BYTES), dtype=np.uint8)  # Packed crop hashes, oldest first
+        self._entries = []  # (text, confidence) per cached hash
+        self._boxes = None  # Boxes of the last detection
+        self._thumb = None  # Thumbnail the last detection ran on
+        self.stats = {"detections": 0, "reused_detections": 0, "hits": 0, "misses": 0}
+
+    def read(self, gray):
+        """OCR a grayscale frame; returns EasyOCR-style [(box points, text, confidence)]."""
+        if self.engine.detect is None:
+            return self.engine.readtext(gray)
+        boxes = self._detect(gray)
+        results, missing = [None] * len(boxes), []
+        hashes = [crop_hash(gray, box) for box in boxes]
+
+        for i, (box, crop) in enumerate(zip(boxes, hashes)):
+            cached = self._lookup(crop)
+            if cached is None:
+                missing.append(i)
+            else:
+                results[i] = (box_points(box), *cached)
+        self.stats["hits"] += len(boxes) - len(missing)
+        self.stats["misses"] += len(missing)
+
+        if missing:
+            # ✅ Only new or changed lines reach the recognizer, all in one call
+            recognized = self.engine.recognize(gray, [boxes[i] for i in missing])
+            for i, (text, confidence) in zip(missing, recognized):
+                results[i] = (box_points(boxes[i]), text, confidence)
+                self._store(hashes[i], text, confidence)
+        return results
+
+    def _detect(self, gray):
+        thumb = cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+        if self._boxes is not None and np.abs(thumb - self._thumb).mean() < DETECT_REUSE_THRESHOLD:
+            self.stats["reused_detections"] += 1
+            return self._boxes
+
+        self._boxes = self.engine.detect(gray)  # [x_min, x_max, y_min, y_max] per text box
+        self.stats["detections"] += 1
+        self._thumb = thumb
+        return self._boxes
+
+    def _lookup(self, crop):
+        if not len(self._entries):
+            return None
+        distances = np.unpackbits(self._hashes ^ crop, axis=1).sum(axis=1)
+        best = int(distances.argmin())
+        return self._entries[best] if distances[best] <= self.hash_tolerance else None
+
+    def _store(self, crop, text, confidence):
+        if len(self._entries) >= self.cache_size:  # Drop the oldest entries (FIFO keeps the matrix contiguous)
+            drop = len(self._entries) - self.cache_size + 1
+            self._hashes, self._entries = self._hashes[drop:], self._entries[drop:]
+        self._hashes = np.vstack([self._hashes, crop[None]])
+        self._entries.append((text, confidence))
+
+def box_points(box):
+    """[x_min, x_max, y_min, y_max] -> four corner points, as EasyOCR's readtext returns them."""
+    x_min, x_max, y_min, y_max = box
+    return [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+
+def crop_hash(gray, box):
+    """256-bit average hash of a text box, packed into HASH_BYTES bytes (aspect-aware: 64x4 cells)."""
+    x_min, x_max, y_min, y_max = box
+    cells = cv2.resize(gray[y_min:y_max, x_min:x_max], (64, 4), interpolation=cv2.INTER_AREA)
+    return np.packbits(cells > cells.mean())
+
+def band_grid(height, band=BAND_HEIGHT, overlap=BAND_OVERLAP):
+    """(y0, y1) full-width bands covering the image, each overlapping the next by `overlap` rows.
+
+    Bands rather than square tiles: a text line never crosses a vertical seam, so no line is
+    cut into two different fragments that both survive the merge.
+    """
+    if height <= band:
+        return [(0, height)]
+    starts = list(range(0, height - band, band - overlap)) + [height - band]  # Last band flush with the edge
+    return [(y, y + band) for y in starts]
+
+def read_tiled(read, gray, band=BAND_HEIGHT, overlap=BAND_OVERLAP, workers=BAND_WORKERS):
+    """OCR a large grayscale image band by band on a worker pool; returns merged [(box, text, confidence)].
+
+    `read(band_image)` is an EasyOCR-style readtext. Bands are views into `gray`, so extra memory is
+    bounded by `workers` bands in flight, not by the capture height. Boxes come back in image
+    coordinates; a line read in two overlapping bands is kept once.
+    """
+    bands = band_grid(gray.shape[0], band, overlap)
+
+    def read_band(bounds):
+        y0, y1 = bounds
+        return [((np.asarray(box, dtype=np.float32) + (0, y0)).tolist(), text, float(confidence))
+                for box, text, confidence in read(gray[y0:y1])]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(bands)))) as pool:
+        results = [item for band_results in pool.map(read_band, bands) for item in band_results]
+    return merge_overlaps(results)
+
+def merge_overlaps(results, containment=SEAM_CONTAINMENT):
+    """Drop boxes mostly covered by a larger (or, if the same size, more confident) box.
+
+    A line cut by a band seam is read whole in the neighbouring band, whose box contains the partial one.
+    """
+    if not results:
+        return []
+    rects = np.array([[np.min(np.asarray(b)[:, 0]), np.min(np.asarray(b)[:, 1]),
+                       np.max(np.asarray(b)[:, 0]), np.max(np.asarray(b)[:, 1])] for b, _, _ in results])
+    areas = (rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])
+    confidences = np.array([r[2] for r in results])
+    order = np.lexsort((-confidences, -areas))  # Largest first, then most confident
+
+    kept = []
+    for i in order:
+        ix = np.clip(np.minimum(rects[i, 2], rects[kept, 2]) - np.maximum(rects[i, 0], rects[kept, 0]), 0, None)
+        iy = np.clip(np.minimum(rects[i, 3], rects[kept, 3]) - np.maximum(rects[i, 1], rects[kept, 1]), 0, None)
+        if kept and (ix * iy / max(areas[i], 1e-6)).max() >= containment:
+            continue
+        kept.append(i)
+    return [results[i] for i in sorted(kept)]
+
+def document_lines(results, min_confidence=MIN_CONFIDENCE):
+    """Reading order for a full page: split into columns at vertical gutters, then lines per column."""
+    results = [r for r in results if r[2] >= min_confidence and r[1].strip()]
+    if not results:
+        return []
+    rects = np.array([[np.min(np.asarray(b)[:, 0]), np.max(np.asarray(b)[:, 0]),
+                       np.ptp(np.asarray(b)[:, 1])] for b, _, _ in results])
+    left, right = int(rects[:, 0].min()), int(np.ceil(rects[:, 1].max()))
+
+    # Columns are separated by x ranges no box covers, wider than a few text heights
+    covered = np.zeros(right - left + 1, dtype=bool)
+    for x0, x1, _ in rects:
+        covered[int(x0) - left:int(np.ceil(x1)) - left + 1] = True
+    min_gutter = 3 * float(np.median(rects[:, 2]))
+    edges, run_start = [], None
+    for x, filled in enumerate(covered):
+        if not filled and run_start is None:
+            run_start = x
+        elif filled and run_start is not None:
+            if x - run_start >= min_gutter:
+                edges.append(left + (run_start + x) / 2)
+            run_start = None
+
+    columns = np.searchsorted(edges, (rects[:, 0] + rects[:, 1]) / 2)
+    lines = []
+    for column in range(len(edges) + 1):
+        lines.extend(reading_lines([r for r, c in zip(results, columns) if c == column], min_confidence))
+    return lines
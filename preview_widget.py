@@ -0,0 +1,88 @@
+import numpy as np
+from kivy.uix.image import Image
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, InstructionGroup, Line, Rectangle
+from kivy.graphics.texture import Texture
+
+OVERLAY_COLOR = (0, 1, 0, 1)  # Box and caption colour (green, as the old cv2 drawing)
+
+def frame_buffer(frame):
+    """Return a flat byte view of `frame` for Texture.blit_buffer, copying only if it is not contiguous."""
+    return memoryview(np.ascontiguousarray(frame)).cast("B")
+
+class CameraPreview(Image):
+    """Image widget that shows camera frames through one reusable texture.
+
+    The texture is allocated once per resolution and flipped through its texture
+    coordinates, so each new frame is a single upload with no Python-side copy.
+    Detection overlays are canvas instructions drawn above the texture, never pixels
+    written into the frame.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frame_seq = 0  # Sequence number of the frame currently on screen
+        self._texture_key = None  # (width, height, colorfmt) of the allocated texture
+        self._overlay = InstructionGroup()
+        self.canvas.after.add(self._overlay)
+        self._overlay_result = None  # Last DetectionResult, redrawn when the widget moves or resizes
+        self._captions = {}  # Caption text -> rendered texture, so repeated labels are not re-rendered
+        self.bind(pos=self._redraw_overlay, size=self._redraw_overlay)
+
+    def show_frame(self, frame):
+        """Upload a BGR (or grayscale) frame into the preview texture."""
+        height, width = frame.shape[:2]
+        colorfmt = "bgr" if frame.ndim == 3 else "luminance"
+
+        if self._texture_key != (width, height, colorfmt):
+            # ✅ Allocate only when the resolution changes; OpenCV rows are top-down, GL is bottom-up
+            texture = Texture.create(size=(width, height), colorfmt=colorfmt)
+            texture.flip_vertical()
+            self._texture_key = (width, height, colorfmt)
+            self.texture = texture
+
+        self.texture.blit_buffer(frame_buffer(frame), colorfmt=colorfmt, bufferfmt="ubyte")
+        self.canvas.ask_update()  # Same texture object, so the Image will not redraw on its own
+
+    def show_latest(self, camera):
+        """Show the newest CameraManager frame if it has not been shown yet. Returns True if redrawn."""
+        seq, frame = camera.read_latest(copy=False)  # Uploaded immediately, so the ring slot can be borrowed
+        if frame is None or seq == self.frame_seq:
+            return False
+        self.frame_seq = seq
+        self.show_frame(frame)
+        return True
+
+    def show_detections(self, result):
+        """Draw a DetectionResult's boxes and captions over the preview (None clears them)."""
+        self._overlay_result = result
+        self._redraw_overlay()
+
+    def _redraw_overlay(self, *args):
+        self._overlay.clear()
+        result = self._overlay_result
+        if not result or not result.detections or not self.texture:
+            return
+
+        # Where the texture is drawn: aspect-fit and centred (Image defaults)
+        shown_w, shown_h = self.norm_image_size
+        left, bottom = self.center_x - shown_w / 2, self.center_y - shown_h / 2
+        frame_w, frame_h = result.frame_size
+        sx, sy = shown_w / frame_w, shown_h / frame_h
+
+        self._overlay.add(Color(*OVERLAY_COLOR))
+        for detection in result.detections:
+            x1, y1, x2, y2 = detection.box
+            x, y = left + x1 * sx, bottom + (frame_h - y2) * sy  # Frame rows are top-down, Kivy is bottom-up
+            self._overlay.add(Line(rectangle=(x, y, (x2 - x1) * sx, (y2 - y1) * sy), width=1.5))
+            caption = self._caption(f"{detection.label}: {detection.confidence:.2f}")
+            self._overlay.add(Rectangle(texture=caption, pos=(x, y + (y2 - y1) * sy + 2), size=caption.size))
+
+    def _caption(self, text):
+        if text not in self._captions:
+            if len(self._captions) > 256:
+                self._captions.clear()
+            label = CoreLabel(text=text, font_size=14, color=OVERLAY_COLOR)
+            label.refresh()
+            self._captions[text] = label.texture
+        return self._captions[text]
@@ -0,0 +1,44 @@
+import threading
+from collections import namedtuple
+from kivy.clock import Clock
+
+# One detected object; box = (x1, y1, x2, y2) in pixels of the frame the detector saw
+Detection = namedtuple("Detection", ["label", "confidence", "box"])
+
+# Everything one inference produced; frame_size = (width, height) that `box` coordinates refer to
+DetectionResult = namedtuple("DetectionResult", ["frame_seq", "frame_size", "detections"])
+
+class ResultBus:
+    """Latest-wins hand-off of results from a worker thread to the Kivy UI thread.
+
+    Workers call `publish()` and never touch widgets. The UI callback `apply(result)` runs on
+    the UI thread at most once per frame: a burst of results published between two frames is
+    coalesced and only the newest is applied.
+    """
+
+    def __init__(self, apply):
+        self.apply = apply
+        self._lock = threading.Lock()
+        self._pending = None
+        self._trigger = Clock.create_trigger(self._flush)  # Fires once on the next frame however often it is pulled
+        self.published = 0
+        self.applied = 0
+
+    def publish(self, result):
+        """Thread-safe: replace any not-yet-applied result and request a UI update."""
+        with self._lock:
+            self._pending = result
+            self.published += 1
+        self._trigger()
+
+    def clear(self):
+        """Drop a pending result (e.g. when scanning stops)."""
+        with self._lock:
+            self._pending = None
+
+    def _flush(self, dt):
+        with self._lock:
+            result, self._pending = self._pending, None
+        if result is not None:
+            self.applied += 1
+            self.apply(result)
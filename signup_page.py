@@ -13,6 +13,7 @@ from kivy.uix.relativelayout import RelativeLayout
 from kivy.graphics import Color, Rectangle
 from kivy.clock import Clock
 from CameraManager import CameraManager  # ✅ CameraManager for accessing the camera
+import face_store
 
 # ✅ Firebase Configuration
 FIREBASE_DATABASE_URL = "https://project-mavii1-default-rtdb.firebaseio.com"
@@ -131,26 +132,38 @@ class SignUpPage(Screen):
         if db_response.status_code == 200:
             # ✅ Proceed to Face Scan
             self.signup_error_label.text = "User registered! Scanning face..."
-            self.capture_face()  # ✅ Capture face without displaying camera feed
+            # ✅ Capture and enroll off the UI thread: camera start-up, face detection and embedding take a while
+            threading.Thread(target=self.capture_face, daemon=True).start()
         else:
             self.signup_error_label.text = "Error saving user data!"
 
     def capture_face(self):
-        """Capture user's face and save the image (No Camera Feed)."""
-        self.camera = CameraManager()
-        ret, frame = self.camera.get_frame()
+        """Worker thread: capture the user's face, save the image and enroll it (No Camera Feed)."""
+        camera = CameraManager()
+        ret, frame = camera.get_frame()
+        camera.release_camera()  # ✅ One still is all sign-up needs; stop the capture thread
+
+        if not ret:
+            # ⚠️ Account is saved; only face login is missing
+            Clock.schedule_once(lambda dt: self.signup_done("Camera not ready, face not saved. Log in with your password."))
+            return
 
-        if ret:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
-            # ✅ Create `images` folder if it doesn't exist
-            if not os.path.exists("images"):
-                os.makedirs("images")
+        # ✅ Create `images` folder if it doesn't exist
+        if not os.path.exists("images"):
+            os.makedirs("images")
 
-            # ✅ Save Image with Username
-            image_path = os.path.join("images", f"{self.full_name}.jpg")
-            cv2.imwrite(image_path, gray)
-            print(f"✅ Face image saved: {image_path}")
+        # ✅ Save Image with Username
+        image_path = os.path.join("images", f"{self.full_name}.jpg")
+        cv2.imwrite(image_path, gray)
+        print(f"✅ Face image saved: {image_path}")
+        face_store.store.enroll(f"{self.full_name}.jpg")  # ✅ Adds only this user's samples to the face model
+        Clock.schedule_once(lambda dt: self.signup_done(None))
 
-            # ✅ Redirect to Login Page
-            self.manager.current = "login_page"
+    def signup_done(self, error):
+        """UI thread: show why the face was not saved, or redirect to the Login Page."""
+        if error:
+            self.signup_error_label.text = error
+            return
+        self.manager.current = "login_page"
@@ -0,0 +1,388 @@
+import hashlib
+import heapq
+import io
+import itertools
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Announcement priorities: a lower number is spoken first and interrupts anything less urgent
+URGENT, HIGH, NORMAL, LOW = 0, 1, 2, 3
+
+SPEECH_LANG = "tl"  # Tagalog
+SPEECH_SLOW = False  # gTTS speaking rate: normal or slow
+ESPEAK_RATE = 160  # espeak-ng words per minute
+# espeak-ng voices in order of preference; the first one installed is used (MAVI_ESPEAK_VOICE forces one)
+ESPEAK_VOICES = tuple(filter(None, [os.environ.get("MAVI_ESPEAK_VOICE"), SPEECH_LANG, "en"]))
+TTS_CACHE_DIR = "tts_cache"  # Synthesized phrases, reused across launches
+TTS_CACHE_MAX_BYTES = 20 * 1024 * 1024  # Least recently played phrases are evicted past this
+MIN_SENTENCE_CHARS = 30  # Shorter fragments are merged with the next one before synthesis
+BACKEND_COOLDOWN = 60.0  # Seconds a failed backend (e.g. gTTS while offline) is skipped before retrying
+
+# "auto" = gTTS, falling back to the offline engine when it fails; "gtts" or "espeak" to force one first
+SPEECH_BACKEND = os.environ.get("MAVI_TTS", "auto")
+
+IS_ANDROID = "android" in platform.system().lower()
+
+class SpeechCache:
+    """On-disk LRU cache of synthesized audio, keyed by a hash of (engine, text, language, rate).
+
+    Repeated phrases ("Not Recognized", status messages, names) play without a network
+    round trip. The modification time is bumped on every hit and the least recently used
+    files are deleted once the folder grows past `max_bytes`.
+    """
+
+    def __init__(self, folder=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path(self, key, ext):
+        digest = hashlib.sha256("\0".join(map(str, key)).encode("utf-8")).hexdigest()
+        return os.path.join(self.folder, digest + ext)
+
+    def get(self, key, ext):
+        """Cached audio bytes for the `key` tuple, or None on a miss."""
+        path = self.path(key, ext)
+        try:
+            os.utime(path)  # ✅ Mark as recently used
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key, ext, data):
+        """Store audio bytes (through a temp file) and evict old entries."""
+        path = self.path(key, ext)
+        with self._lock:
+            os.makedirs(self.folder, exist_ok=True)
+            tmp_path = path[:-len(ext)] + ".tmp" + ext
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._evict(keep=path)
+
+    def _evict(self, keep):
+        entries = []
+        for name in os.listdir(self.folder):
+            full = os.path.join(self.folder, name)
+            stat = os.stat(full)
+            entries.append((stat.st_mtime, stat.st_size, full))
+        total = sum(size for _, size, _ in entries)
+        for _, size, full in sorted(entries):  # Oldest first
+            if total <= self.max_bytes:
+                break
+            if full != keep:
+                try:
+                    os.remove(full)
+                except OSError:
+                    continue  # Locked by another process; evicted next time
+                total -= size
+
+speech_cache = SpeechCache()
+
+class GTTSBackend:
+    """Google Text-to-Speech: natural Tagalog voice, needs the network (MP3)."""
+    name, ext = "gtts", ".mp3"
+
+    def __init__(self, lang=SPEECH_LANG, slow=SPEECH_SLOW):
+        self.lang, self.slow = lang, slow
+
+    def available(self):
+        import importlib.util
+        return importlib.util.find_spec("gtts") is not None
+
+    def cache_key(self, text):
+        return (self.name, self.lang, int(self.slow), text)
+
+    def synthesize(self, text):
+        from gtts import gTTS  # Google Text-to-Speech
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang, slow=self.slow).write_to_fp(buffer)
+        return buffer.getvalue()
+
+class EspeakBackend:
+    """espeak-ng (or espeak) run locally: robotic but offline and fast (WAV on stdout)."""
+    name, ext = "espeak", ".wav"
+
+    def __init__(self, voices=ESPEAK_VOICES, rate=ESPEAK_RATE):
+        self.voices, self.rate = voices, rate
+        self.voice = None  # First of `voices` that is installed, found by available()
+        self.executable = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self):
+        if self.executable is None:
+            return False
+        try:
+            listing = subprocess.run([self.executable, "--voices"], check=True, capture_output=True,
+                                     text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            return False
+        installed = {line.split()[1] for line in listing.splitlines()[1:] if len(line.split()) > 1}
+        for voice in self.voices:
+            if voice in installed or any(name.startswith(voice + "-") for name in installed):
+                self.voice = voice
+                if voice != self.voices[0]:
+                    print(f"⚠️ espeak voice {self.voices[0]!r} not installed; using {voice!r}")
+                return True
+        return False
+
+    def cache_key(self, text):
+        return (self.name, self.voice, self.rate, text)
+
+    def synthesize(self, text):
+        return subprocess.run([self.executable, "--stdout", "-v", self.voice, "-s", str(self.rate), text],
+                              check=True, capture_output=True, timeout=30).stdout
+
+def speech_backends(spec=None):
+    """Installed backends in the order they are tried."""
+    spec = spec or SPEECH_BACKEND
+    if spec not in ("auto", "gtts", "espeak"):
+        raise ValueError(f"Unknown speech backend {spec!r}; expected auto, gtts or espeak")
+    backends = [GTTSBackend(), EspeakBackend()]
+    if spec == "espeak":
+        backends.reverse()
+    return [backend for backend in backends if backend.available()]
+
+_backends = None
+_failed_at = {}  # Backend name -> time.monotonic() of its last failure
+
+def synthesize(text):
+    """Audio bytes of `text` from the cache or the first backend that succeeds (e.g. offline fallback).
+
+    A backend that fails is skipped for BACKEND_COOLDOWN seconds (cache hits still count), so
+    offline every sentence goes straight to espeak instead of waiting on gTTS first.
+    """
+    global _backends
+    if _backends is None:
+        _backends = speech_backends()
+    error = None
+    for backend in _backends:
+        data = speech_cache.get(backend.cache_key(text), backend.ext)
+        if data is not None:
+            return data
+        if time.monotonic() - _failed_at.get(backend.name, -BACKEND_COOLDOWN) < BACKEND_COOLDOWN:
+            continue
+        try:
+            data = backend.synthesize(text)
+        except Exception as e:
+            error = e  # e.g. no network for gTTS: try the next engine
+            _failed_at[backend.name] = time.monotonic()
+            print(f"⚠️ {backend.name} speech failed ({e}); skipping it for {BACKEND_COOLDOWN:.0f} s")
+            continue
+        _failed_at.pop(backend.name, None)
+        speech_cache.put(backend.cache_key(text), backend.ext, data)
+        return data
+    reason = error or ("all backends failed recently" if _backends else "none installed")
+    raise RuntimeError(f"No speech backend could synthesize the text ({reason})")
+
+def split_sentences(text):
+    """Split on sentence ends and line breaks, merging fragments shorter than MIN_SENTENCE_CHARS."""
+    sentences, current = [], ""
+    for part in re.split(r"(?<=[.!?;:])\s+|\n+", text.strip()):
+        current = f"{current} {part}".strip() if current else part.strip()
+        if len(current) >= MIN_SENTENCE_CHARS:
+            sentences.append(current)
+            current = ""
+    if current:
+        sentences.append(current)
+    return sentences
+
+def play_speech(text, stop_event, on_start=None):
+    """Speak `text` sentence by sentence, returning early if `stop_event` is set.
+
+    Android uses plyer's system TTS. Elsewhere sentence N+1 is synthesized on a helper thread
+    while sentence N plays through pygame.mixer (decoded straight from memory), so the first
+    audio comes after one sentence however long the text is. Each clip's completion is a wait
+    on `stop_event` for its length: no polling, and an interrupt stops it at once.
+    `on_start()` is called just before the first audio plays.
+    """
+    on_start = on_start or (lambda: None)
+    if IS_ANDROID:
+        from plyer import tts  # Android TTS (not interruptible)
+        try:
+            on_start()
+            tts.speak(text)
+        except Exception as e:
+            print(f"⚠️ TTS error: {e}")
+        return
+
+    import pygame  # For playing audio without FFmpeg
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
+    sentences = split_sentences(text)
+    if not sentences:
+        return
+    prefetch = ThreadPoolExecutor(max_workers=1)
+    try:
+        upcoming = prefetch.submit(synthesize, sentences[0])
+        for i in range(len(sentences)):
+            data = upcoming.result()
+            if i + 1 < len(sentences):
+                upcoming = prefetch.submit(synthesize, sentences[i + 1])  # ✅ Next one while this one plays
+            if stop_event.is_set():
+                return
+
+            sound = pygame.mixer.Sound(file=io.BytesIO(data))
+            if i == 0:
+                on_start()
+            channel = sound.play()
+            if stop_event.wait(sound.get_length()):
+                channel.stop()  # Interrupted
+                return
+            if channel.get_busy():
+                stop_event.wait(0.05)  # Mixer started a little late; let the tail finish
+    except Exception as e:
+        print(f"⚠️ TTS error: {e}")
+    finally:
+        prefetch.shutdown(wait=False, cancel_futures=True)
+
+class _Utterance:
+    __slots__ = ("priority", "order", "text", "key", "queued_at", "cancelled")
+
+    def __init__(self, priority, order, text, key):
+        self.priority, self.order, self.text, self.key = priority, order, text, key
+        self.queued_at = time.monotonic()
+        self.cancelled = False  # Superseded while waiting; skipped when popped
+
+    def __lt__(self, other):
+        return (self.priority, self.order) < (other.priority, other.order)
+
+class Announcer:
+    """The one thread that speaks, fed by a priority queue shared by every page.
+
+    `say()` never blocks. Before anything is queued:
+    - the same text already waiting is dropped (duplicate);
+    - a waiting message with the same `key` is replaced by the new one (superseded), so a burst
+      of "Detected: ..." updates leaves only the latest;
+    - a key spoken less than `min_interval` seconds ago is dropped (rate limited).
+    A message more urgent than the one playing interrupts it. `metrics()` reports queue depth,
+    the time from `say()` to the first audio (queue wait plus synthesis), the queue wait alone,
+    and the drop counters.
+    """
+
+    def __init__(self, player=play_speech):
+        self.player = player  # player(text, stop_event, on_start): blocks until done or stop_event is set
+        self._queue = []  # Heap of _Utterance
+        self._pending = {}  # key -> waiting _Utterance
+        self._last_spoken = {}  # key -> time it last started playing
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._current = None
+        self._playing = False  # The current utterance has started producing audio
+        self._interrupt = threading.Event()
+        self._thread = None
+        self.counts = {"queued": 0, "spoken": 0, "duplicate": 0, "superseded": 0,
+                       "rate_limited": 0, "interrupted": 0}
+        self.latencies = []  # Seconds from say() to the first audio, most recent last
+        self.queue_waits = []  # Seconds from say() to leaving the queue (before synthesis)
+        self.max_depth = 0
+
+    def say(self, text, priority=NORMAL, key=None, min_interval=0.0):
+        """Queue `text`; returns False if it was dropped as a duplicate or rate limited."""
+        if not text:
+            return False
+        key = key or text
+        with self._cond:
+            now = time.monotonic()
+            if min_interval and now - self._last_spoken.get(key, -min_interval) < min_interval:
+                self.counts["rate_limited"] += 1
+                return False
+
+            waiting = self._pending.get(key)
+            if waiting:
+                if waiting.text == text and waiting.priority <= priority:
+                    self.counts["duplicate"] += 1
+                    return False
+                waiting.cancelled = True  # ✅ Superseded: only the newest message per key is spoken
+                self.counts["superseded"] += 1
+
+            utterance = _Utterance(priority, next(self._order), text, key)
+            heapq.heappush(self._queue, utterance)
+            self._pending[key] = utterance
+            self.counts["queued"] += 1
+            self.max_depth = max(self.max_depth, self.depth())
+
+            if self._current and priority < self._current.priority:
+                self._stop_current()  # More urgent: cut the current announcement short
+            self._cond.notify()
+            self._ensure_worker()
+        return True
+
+    def cancel(self, key=None):
+        """Drop waiting messages (all, or one key) and stop the one playing if it matches."""
+        with self._cond:
+            for utterance in self._queue:
+                if key is None or utterance.key == key:
+                    utterance.cancelled = True
+                    self._pending.pop(utterance.key, None)
+            if self._current and (key is None or self._current.key == key):
+                self._stop_current()
+
+    def _stop_current(self):
+        """Signal the player to stop; counted as an interruption only if audio was actually playing."""
+        if self._playing and not self._interrupt.is_set():
+            self.counts["interrupted"] += 1
+        self._interrupt.set()
+
+    def depth(self):
+        """Messages waiting to be spoken."""
+        return len(self._pending)
+
+    def metrics(self):
+        def percentile(samples, p):
+            samples = sorted(samples)
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1) if samples else None
+        return {
+            "queue_depth": self.depth(),
+            "max_queue_depth": self.max_depth,
+            "latency_p50_ms": percentile(self.latencies, 0.5),
+            "latency_p95_ms": percentile(self.latencies, 0.95),
+            "queue_wait_p50_ms": percentile(self.queue_waits, 0.5),
+            "queue_wait_p95_ms": percentile(self.queue_waits, 0.95),
+            **self.counts,
+        }
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                utterance = heapq.heappop(self._queue)
+                if utterance.cancelled:
+                    continue
+                self._pending.pop(utterance.key, None)
+                self._current = utterance
+                self._interrupt.clear()
+                started = time.monotonic()
+                self._last_spoken[utterance.key] = started
+                self.queue_waits.append(started - utterance.queued_at)
+                del self.queue_waits[:-500]
+                self.counts["spoken"] += 1
+
+            def audio_started(utterance=utterance):
+                with self._cond:
+                    self._playing = True
+                    self.latencies.append(time.monotonic() - utterance.queued_at)
+                    del self.latencies[:-500]
+
+            try:
+                self.player(utterance.text, self._interrupt, audio_started)
+            except Exception as e:
+                print(f"⚠️ Speech error: {e}")
+            with self._cond:
+                self._current = None
+                self._playing = False
+
+announcer = Announcer()  # ✅ Shared by every page: one voice, one mixer channel
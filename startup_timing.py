@@ -0,0 +1,34 @@
+import importlib
+import time
+
+class StartupTimer:
+    """Times page imports and page construction during app start-up."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.import_times = {}  # Module name -> seconds
+        self.build_times = {}  # Screen name -> seconds
+
+    def import_page(self, module_name, class_name):
+        """Import `class_name` from `module_name`, recording how long the import took."""
+        start = time.perf_counter()
+        page_class = getattr(importlib.import_module(module_name), class_name)
+        self.import_times[module_name] = time.perf_counter() - start
+        return page_class
+
+    def build_page(self, page_class, name):
+        """Construct a page, recording how long its __init__ took."""
+        start = time.perf_counter()
+        page = page_class(name=name)
+        self.build_times[name] = time.perf_counter() - start
+        return page
+
+    def report(self, model_times=None):
+        """Print a breakdown of start-up time; `model_times` adds the ModelRegistry build times."""
+        print(f"⏱️ Startup: {time.perf_counter() - self.started:.2f}s to first screen")
+        for module_name, seconds in self.import_times.items():
+            print(f"   import {module_name:<28} {seconds * 1000:8.1f} ms")
+        for name, seconds in self.build_times.items():
+            print(f"   build  {name:<28} {seconds * 1000:8.1f} ms")
+        for name, seconds in (model_times or {}).items():
+            print(f"   model  {name:<28} {seconds * 1000:8.1f} ms")
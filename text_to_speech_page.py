@@ -1,41 +1,32 @@
 import cv2
-import easyocr
 import numpy as np
 import threading
-import os
-import random
-import pygame
-from gtts import gTTS
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
 from kivy.uix.scrollview import ScrollView
-from kivy.uix.image import Image
 from kivy.clock import Clock
-from kivy.graphics.texture import Texture
 from CameraManager import CameraManager  # Shared Camera Manager
+from document_preprocess import prepare_document
+from preview_widget import CameraPreview
+from inference_runner import InferenceRunner
+from model_registry import models
+from ocr_engines import create_ocr_engine
+from ocr_pipeline import SceneGate, TranscriptStabilizer, TwoStageOCR, BAND_WORKERS, document_lines, read_tiled, reading_lines
+from result_bus import ResultBus
+from speech import HIGH, announcer
 
-# Initialize pygame mixer for playing audio
-pygame.mixer.init()
+# ✅ EasyOCR, PaddleOCR or Tesseract (MAVI_OCR, or measured once per device), built on first use
+models.register("ocr_reader", create_ocr_engine)
 
-def speak(text):
-    """Use gTTS for speech and play it using pygame.mixer."""
-    try:
-        filename = f"temp_{random.randint(0, 99999)}.mp3"
-        tts = gTTS(text=text, lang="tl")
-        tts.save(filename)
-
-        pygame.mixer.music.load(filename)
-        pygame.mixer.music.play()
-
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-
-        os.remove(filename)
-    except Exception as e:
-        print(f"⚠️ gTTS error: {e}")
+OCR_RATE = 2  # Max live OCR passes per second (each costs up to seconds on CPU anyway)
+OCR_SIZE = 1280  # Longer side of frames handed to live OCR
+PHOTO_MIN_CONFIDENCE = 0.8  # A single photo has no cross-frame vote, so only confident readings count
+SCAN_TIMEOUT = 15  # Seconds of scanning without any text before the user is prompted
+DOCUMENT_FRAME_TIMEOUT = 3.0  # Seconds to wait for the first full-resolution frame after switching profile
+HOLD_STEADY_MESSAGE = "Hold steady. The picture is too blurry or too dark to read."
 
 class TextRecognitionPage(Screen):
     def __init__(self, **kwargs):
@@ -43,14 +34,22 @@ class TextRecognitionPage(Screen):
         self.camera = None
         self.is_scanning = False  # Scanning starts only when page opens
         self.ocr_result = "Position object in front of the camera"
-        self.reader = easyocr.Reader(['en'])
         self.scan_timer = 0  # Timer to track scanning duration
+        self.runner = None  # InferenceRunner driving scan_text
+        self.scan_id = 0  # Bumped on every start / stop; a pass from an older scan discards its result
+        self.ocr_lock = threading.Lock()  # A stopped scan may still be finishing its OCR pass
+        self.gate_scan = None  # scan_id the gate and stabilizer were last reset for
+        self.gate = SceneGate()  # Skips blurry frames and pages that were already read
+        self.stabilizer = TranscriptStabilizer()  # Votes lines across frames into one transcript
+        self.ocr = None  # TwoStageOCR around the shared reader, created on the OCR thread
+        self.reading_document = False  # Document mode capture / OCR in progress
+        self.results = ResultBus(self.show_scan_state)  # OCR thread -> UI thread
 
         layout = BoxLayout(orientation='vertical', spacing=10, padding=20)
         self.label = Label(text="Text Recognition", size_hint=(1, 0.1))
         layout.add_widget(self.label)
 
-        self.image_widget = Image(size_hint=(1, 0.5))
+        self.image_widget = CameraPreview(size_hint=(1, 0.5))
         layout.add_widget(self.image_widget)
 
         scroll_view = ScrollView(size_hint=(1, 0.3))
@@ -69,15 +68,19 @@ class TextRecognitionPage(Screen):
         layout.add_widget(self.status_label)
 
         buttons_layout = BoxLayout(size_hint=(1, 0.2))
-        self.scan_button = Button(text="Start Scanning", size_hint=(0.33, 0.2))
+        self.scan_button = Button(text="Start Scanning", size_hint=(0.25, 0.2))
         self.scan_button.bind(on_press=self.toggle_scan)
         buttons_layout.add_widget(self.scan_button)
         
-        self.capture_button = Button(text="Take Photo", size_hint=(0.33, 0.2))
+        self.capture_button = Button(text="Take Photo", size_hint=(0.25, 0.2))
         self.capture_button.bind(on_press=self.capture_photo)
         buttons_layout.add_widget(self.capture_button)
         
-        self.read_aloud_button = Button(text="Read Aloud", size_hint=(0.33, 0.2))
+        self.document_button = Button(text="Read Page", size_hint=(0.25, 0.2))
+        self.document_button.bind(on_press=self.read_document)
+        buttons_layout.add_widget(self.document_button)
+
+        self.read_aloud_button = Button(text="Read Aloud", size_hint=(0.25, 0.2))
         self.read_aloud_button.bind(on_press=self.read_aloud)
         buttons_layout.add_widget(self.read_aloud_button)
         
@@ -85,24 +88,85 @@ class TextRecognitionPage(Screen):
         self.add_widget(layout)
 
     def capture_photo(self, instance):
-        """Capture an image from the camera and scan for text."""
+        """Capture an image from the camera and scan it for text (off the UI thread)."""
         if self.camera:
             ret, frame = self.camera.get_frame()
             if ret:
                 photo_path = "captured_photo.png"
                 cv2.imwrite(photo_path, frame)
                 self.label.text = f"Photo saved: {photo_path}"
-                
-                preprocessed = self.preprocess_image(frame)
-                results = self.reader.readtext(preprocessed)
-                detected_text = " ".join([res[1] for res in results if res[2] >= 0.8])
-                
-                if detected_text:
-                    Clock.schedule_once(lambda dt: self.update_text_display(detected_text))
+                threading.Thread(target=self.read_photo, args=(frame,), daemon=True).start()
+
+    def read_photo(self, frame):
+        """OCR one captured photo and show (or announce the lack of) its text."""
+        page = prepare_document(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        if page.image is None:
+            message = HOLD_STEADY_MESSAGE  # ⚠️ Blurry or washed out: don't waste an OCR pass on it
+            print(f"⚠️ Photo quality {page.quality:.2f}, sharpness {page.sharpness:.0f}")
+            Clock.schedule_once(lambda dt: self.update_text_display(message))
+            announcer.say(message, key="ocr_status")
+            return
+
+        results = models.get("ocr_reader").readtext(page.image)
+        detected_text = "\n".join(text for y, text in reading_lines(results, PHOTO_MIN_CONFIDENCE))
+
+        if detected_text:
+            Clock.schedule_once(lambda dt: self.update_text_display(detected_text))
+        else:
+            message = "No text detected. Try again."
+            Clock.schedule_once(lambda dt: self.update_text_display(message))
+            announcer.say(message, key="ocr_status")
+
+    def read_document(self, instance):
+        """Document mode: one full-resolution still, read in overlapping full-width bands."""
+        if self.reading_document:
+            return
+        resume = self.is_scanning
+        self.stop_scan()  # Live OCR and the preview pause while the page is captured at full size
+        if not self.camera or not self.camera.is_running():
+            self.camera = CameraManager()
+        self.reading_document = True
+        self.status_label.text = "Hold the page steady..."
+        threading.Thread(target=self.read_document_tiles, args=(self.camera, resume), daemon=True).start()
+
+    def read_document_tiles(self, camera, resume):
+        """Capture at the document profile, OCR band by band on a pool, and show the page in reading order."""
+        text, message = "", "No text detected. Try again."
+        try:
+            last_seq, _ = camera.read_latest(copy=False)
+            camera.use_profile("document")
+            seq, frame = camera.read_after(last_seq, timeout=DOCUMENT_FRAME_TIMEOUT)
+            camera.use_profile("preview")
+            if frame is not None:
+                page = prepare_document(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+                if page.image is None:
+                    message = HOLD_STEADY_MESSAGE
+                    print(f"⚠️ Page quality {page.quality:.2f}, sharpness {page.sharpness:.0f}")
                 else:
-                    message = "No text detected. Try again."
-                    Clock.schedule_once(lambda dt: self.update_text_display(message))
-                    threading.Thread(target=speak, args=(message,), daemon=True).start()
+                    reader = models.get("ocr_reader")
+                    with self.ocr_lock:  # The live scan stopped above may still be finishing a pass
+                        workers = BAND_WORKERS if reader.thread_safe else 1  # Paddle: one band at a time
+                        results = read_tiled(reader.readtext, page.image, workers=workers)
+                    text = "\n".join(line for y, line in document_lines(results, PHOTO_MIN_CONFIDENCE))
+        except Exception as e:
+            print(f"⚠️ Document OCR error: {e}")
+        Clock.schedule_once(lambda dt: self.document_done(text, resume, message))
+
+    def document_done(self, text, resume, message):
+        self.reading_document = False
+        if text:
+            self.update_text_display(text)
+            self.status_label.text = "Page read. Tap Read Aloud."
+        else:
+            self.status_label.text = message
+            announcer.say(message, key="ocr_status")
+        if resume:
+            self.start_scan()
+
+    def update_text_display(self, text):
+        """UI thread: show recognized text and keep it for Read Aloud."""
+        self.ocr_result = text
+        self.text_area.text = text
 
     def on_enter(self):
         """Start scanning only when the page is opened."""
@@ -115,35 +179,97 @@ class TextRecognitionPage(Screen):
             self.start_scan()
 
     def start_scan(self):
-        if not self.camera:
+        if not self.camera or not self.camera.is_running():
             self.camera = CameraManager()
         self.is_scanning = True
+        self.scan_timer = 0
         self.scan_button.text = "Stop Scanning"
+        self.status_label.text = "Scanning for text..."
         Clock.schedule_interval(self.update_camera_feed, 1.0 / 30.0)
-        threading.Thread(target=self.scan_text, daemon=True).start()
         Clock.schedule_interval(self.check_scan_timeout, 1)
 
+        self.stop_ocr()
+        self.scan_id += 1
+        self.runner = InferenceRunner(self.camera, self.scan_text, max_rate=OCR_RATE, max_side=OCR_SIZE)
+        self.runner.start()  # Live OCR on a background thread, gated per frame
+
     def stop_scan(self):
         self.is_scanning = False
+        self.scan_id += 1
         self.scan_button.text = "Start Scanning"
         Clock.unschedule(self.update_camera_feed)
+        Clock.unschedule(self.check_scan_timeout)
+        self.stop_ocr()
+
+    def stop_ocr(self):
+        """Stop the OCR thread without waiting: a pass can take seconds, and its result is discarded."""
+        if self.runner:
+            self.runner.stop(wait=False)
+            self.runner = None
+        self.results.clear()
+
+    def scan_text(self, frame, seq):
+        """OCR one new frame if it is sharp and shows something not read yet; merge it into the transcript."""
+        scan = self.scan_id
+        if not self.is_scanning:
+            return False
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        with self.ocr_lock:  # Waits here (off the UI thread) for a stopped scan's last pass
+            if scan != self.scan_id:
+                return False
+            if self.gate_scan != scan:  # First frame of a new scan
+                self.gate.reset()
+                self.stabilizer.reset()
+                self.gate_scan = scan
+
+            verdict = self.gate.check(gray, self.stabilizer.settled)
+            if verdict == "blurry":
+                self.results.publish(("Hold steady...", self.stabilizer.transcript))
+                return
+            if verdict == "skip":
+                return  # ✅ Same page, already read: no OCR pass
+            if verdict == "new_view":
+                self.stabilizer.reset()
+
+            if self.ocr is None:
+                self.ocr = TwoStageOCR(models.get("ocr_reader"))
+            results = self.ocr.read(gray)  # ✅ Recognizes only text boxes not seen before
+            if scan != self.scan_id:
+                return False  # Stopped or restarted during the pass
+            self.stabilizer.update(reading_lines(results))
+            status = "Text read. Tap Read Aloud." if self.stabilizer.settled else "Reading..."
+            self.results.publish((status, self.stabilizer.transcript))
+
+    def show_scan_state(self, state):
+        """UI thread: apply the newest (status, transcript) from the OCR thread."""
+        status, transcript = state
+        if not self.is_scanning:
+            return
+        self.status_label.text = status
+        if transcript and transcript != self.ocr_result:
+            self.update_text_display(transcript)
+
+    def check_scan_timeout(self, dt):
+        """Once a second: prompt the user if nothing has been read for SCAN_TIMEOUT seconds."""
+        if not self.is_scanning:
+            return False
+        self.scan_timer = 0 if self.stabilizer.transcript else self.scan_timer + 1
+        if self.scan_timer == SCAN_TIMEOUT:
+            message = "No text found. Move closer or add light."
+            self.status_label.text = message
+            announcer.say(message, key="ocr_status")
 
     def update_camera_feed(self, dt):
         """Update the camera feed display."""
         if self.camera:
-            ret, frame = self.camera.get_frame()
-            if ret:
-                buf = cv2.flip(frame, 0).tobytes()
-                texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt='bgr')
-                texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
-                self.image_widget.texture = texture
+            self.image_widget.show_latest(self.camera)  # Reuses one texture; skips frames already shown
 
     def read_aloud(self, instance):
-        threading.Thread(target=speak, args=(self.ocr_result,), daemon=True).start()
+        announcer.say(self.ocr_result, priority=HIGH, key="read_aloud")  # User asked: interrupts status messages
 
     def on_leave(self, *args):
-        self.is_scanning = False
-        Clock.unschedule(self.update_camera_feed)
+        self.stop_scan()
         if self.camera:
             self.camera.release_camera()
             self.camera = None